@@ -1,24 +1,49 @@
-from .gget_ref import ref
-from .gget_search import search
-from .gget_info import info
-from .gget_seq import seq
-from .gget_muscle import muscle
-from .gget_blast import blast
-from .gget_blat import blat
-from .gget_enrichr import enrichr
-from .gget_archs4 import archs4
-from .gget_alphafold import alphafold
-from .gget_setup import setup
-from .gget_pdb import pdb
-from .gget_gpt import gpt
-from .gget_cellxgene import cellxgene
-from .gget_elm import elm
-from .gget_diamond import diamond
-from .gget_cosmic import cosmic
-from .gget_mutate import mutate
-from .gget_opentargets import opentargets
-from .gget_cbio import cbio_plot, cbio_search
-from .gget_bgee import bgee
+import importlib
+
+# Public functions and the submodules that define them
+# (submodules are only imported on first access, so that importing gget or running
+# 'gget --help' does not load the full pandas/IPython/matplotlib stack)
+_MODULE_FUNCTIONS = {
+    "ref": "gget_ref",
+    "search": "gget_search",
+    "info": "gget_info",
+    "seq": "gget_seq",
+    "muscle": "gget_muscle",
+    "blast": "gget_blast",
+    "blat": "gget_blat",
+    "enrichr": "gget_enrichr",
+    "archs4": "gget_archs4",
+    "alphafold": "gget_alphafold",
+    "setup": "gget_setup",
+    "pdb": "gget_pdb",
+    "gpt": "gget_gpt",
+    "cellxgene": "gget_cellxgene",
+    "elm": "gget_elm",
+    "diamond": "gget_diamond",
+    "cosmic": "gget_cosmic",
+    "mutate": "gget_mutate",
+    "opentargets": "gget_opentargets",
+    "cbio_plot": "gget_cbio",
+    "cbio_search": "gget_cbio",
+    "bgee": "gget_bgee",
+}
+
+__all__ = list(_MODULE_FUNCTIONS)
+
+
+def __getattr__(name):
+    if name in _MODULE_FUNCTIONS:
+        module = importlib.import_module(f".{_MODULE_FUNCTIONS[name]}", __name__)
+        function = getattr(module, name)
+        # Cache the function on the package so later lookups skip __getattr__
+        globals()[name] = function
+        return function
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
 
 import logging
 # Mute numexpr threads info
@@ -16,6 +16,26 @@ MUSCLE_PATH = os.path.join(
 )
 
 
+def _run_command(command, cwd):
+    """
+    Runs a command without a shell in the directory 'cwd' and exits if it fails.
+
+    Args:
+    - command   List of program arguments.
+    - cwd       Directory to run the command in.
+    """
+    process = subprocess.run(command, cwd=cwd, stderr=subprocess.PIPE)
+    # Log the standard error if it is not empty
+    stderr = process.stderr.decode("utf-8")
+    if stderr:
+        sys.stderr.write(stderr)
+    # Exit system if the subprocess returned with an error
+    if process.returncode != 0:
+        sys.exit(
+            f"'{' '.join(command)}' command returned with error {process.returncode}."
+        )
+
+
 def compile_muscle():
     """
     Compiles MUSCLE from source.
@@ -29,30 +49,12 @@ def compile_muscle():
 
     logger.info("Compiling MUSCLE binary from source... ")
 
-    # Record current working directory
-    cwd = os.getcwd()
-
-    # Change path to package path
-    os.chdir(PACKAGE_PATH)
     # Create folders 'bins/compiled/' inside gget package
-    os.makedirs("bins/compiled/", exist_ok=True)
-    # Change path to PACKAGE_PATH/bins/compiled/
-    os.chdir("bins/compiled/")
+    compiled_path = os.path.join(PACKAGE_PATH, "bins/compiled/")
+    os.makedirs(compiled_path, exist_ok=True)
 
     # Clone MUSCLE repo into PACKAGE_PATH/bins/compiled/
-    command1 = "git clone " + MUSCLE_GITHUB_LINK + " -q"
-
-    with subprocess.Popen(command1, shell=True, stderr=subprocess.PIPE) as process_1:
-        stderr_1 = process_1.stderr.read().decode("utf-8")
-        # Log the standard error if it is not empty
-        if stderr_1:
-            sys.stderr.write(stderr_1)
-    # Exit system if the subprocess returned with an error
-    if process_1.wait() != 0:
-        sys.exit(f"'{command1}' command returned with error {process_1.wait()}.")
-
-    # Change path to PACKAGE_PATH/bins/compiled/muscle/src/
-    os.chdir("muscle/src/")
+    _run_command(["git", "clone", MUSCLE_GITHUB_LINK, "-q"], cwd=compiled_path)
 
     # Run make command
     if platform.system() == "Linux":
@@ -67,18 +69,7 @@ def compile_muscle():
             "Please run 'brew install gcc' to install gcc v11 if the compile fails."
         )
 
-    command2 = "make -s"
-
-    with subprocess.Popen(command2, shell=True, stderr=subprocess.PIPE) as process_2:
-        stderr_2 = process_2.stderr.read().decode("utf-8")
-        # Log the standard error if it is not empty
-        if stderr_2:
-            sys.stderr.write(stderr_2)
-    # Exit system if the subprocess returned with an error
-    if process_2.wait() != 0:
-        sys.exit(f"'{command2}' command returned with error {process_2.wait()}.")
+    # Run make inside PACKAGE_PATH/bins/compiled/muscle/src/
+    _run_command(["make", "-s"], cwd=os.path.join(compiled_path, "muscle/src/"))
 
     logger.info("MUSCLE compiled.")
-
-    # Change path back to cwd
-    os.chdir(cwd)
@@ -6,6 +6,8 @@ ENSEMBL_FTP_URL = "http://ftp.ensembl.org/pub/"
 ENSEMBL_FTP_URL_GRCH37 = "http://ftp.ensembl.org/pub/grch37/"
 # Non-vertebrate server
 ENSEMBL_FTP_URL_NV = "http://ftp.ensemblgenomes.org/pub/"
+# Species shortcuts for gget search and ref
+ENSEMBL_SPECIES_SHORTCUTS = {"human": "homo_sapiens", "mouse": "mus_musculus"}
 
 # NCBI URL for gget info
 NCBI_URL = "https://www.ncbi.nlm.nih.gov"
@@ -65,6 +67,18 @@ COSMIC_RELEASE_URL = "https://cancer.sanger.ac.uk/cosmic/release_notes"
 
 # OpenTargets API endpoint
 OPENTARGETS_GRAPHQL_API = "https://api.platform.opentargets.org/api/v4/graphql"
+# Resources that can be queried with gget opentargets
+# (listed here for the command line parser, which is built without importing gget_opentargets.py;
+# tests/test_opentargets.py checks that they match the resources defined there)
+OPENTARGETS_RESOURCES = [
+    "diseases",
+    "drugs",
+    "tractability",
+    "pharmacogenetics",
+    "expression",
+    "depmap",
+    "interactions",
+]
 
 # CBIO data
 CBIO_CANCER_TYPE_TO_TISSUE_DICTIONARY = {
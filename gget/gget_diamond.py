@@ -3,6 +3,7 @@ import sys
 import platform
 import os
 import pandas as pd
+import tempfile
 import uuid
 import json as json_package
 
@@ -94,13 +95,13 @@ def diamond(
         out = os.path.abspath(out)
         output = f"{out}/DIAMOND_results.tsv"
     else:
-        output = os.path.abspath(f"tmp_{str(uuid.uuid4())}_out.tsv")
+        output = os.path.join(tempfile.gettempdir(), f"tmp_{str(uuid.uuid4())}_out.tsv")
         files_to_delete.append(output)
 
     if not diamond_db and out:
         diamond_db = f"{out}/DIAMOND_db"
     elif not diamond_db:
-        diamond_db = os.path.abspath(f"tmp_db_{str(uuid.uuid4())}")
+        diamond_db = os.path.join(tempfile.gettempdir(), f"tmp_db_{str(uuid.uuid4())}")
         files_to_delete.append(diamond_db + ".dmnd")
 
     if diamond_binary:
@@ -132,42 +133,45 @@ def diamond(
     if verbose:
         logger.info(f"Creating DIAMOND database and initiating alignment...")
 
-    with subprocess.Popen(command, shell=True, stderr=subprocess.PIPE) as process:
-        stderr = process.stderr.read().decode("utf-8")
-        # Log the standard error if it is not empty
-        if stderr:
-            sys.stderr.write(stderr)
-
-    # Exit system if the subprocess returned wstdout = sys.stdout
-    if process.wait() != 0:
-        raise RuntimeError("DIAMOND alignment failed.")
-    else:
-        if verbose:
-            logger.info(f"DIAMOND alignment complete.")
-
-    df_diamond = tsv_to_df(
-        output,
-        headers=[
-            "query_accession",
-            "subject_accession",
-            "identity_percentage",
-            "query_seq_length",
-            "subject_seq_length",
-            "length",
-            "mismatches",
-            "gap_openings",
-            "query_start",
-            "query_end",
-            "subject_start",
-            "subject_end",
-            "e-value",
-            "bit_score",
-        ],
-    )
+    # (temporary files are deleted even if the alignment fails)
+    try:
+        with subprocess.Popen(command, shell=True, stderr=subprocess.PIPE) as process:
+            stderr = process.stderr.read().decode("utf-8")
+            # Log the standard error if it is not empty
+            if stderr:
+                sys.stderr.write(stderr)
+
+        # Exit system if the subprocess returned wstdout = sys.stdout
+        if process.wait() != 0:
+            raise RuntimeError("DIAMOND alignment failed.")
+        else:
+            if verbose:
+                logger.info(f"DIAMOND alignment complete.")
+
+        df_diamond = tsv_to_df(
+            output,
+            headers=[
+                "query_accession",
+                "subject_accession",
+                "identity_percentage",
+                "query_seq_length",
+                "subject_seq_length",
+                "length",
+                "mismatches",
+                "gap_openings",
+                "query_start",
+                "query_end",
+                "subject_start",
+                "subject_end",
+                "e-value",
+                "bit_score",
+            ],
+        )
 
-    # Delete temporary files
-    if files_to_delete:
-        remove_temp_files(files_to_delete)
+    finally:
+        # Delete temporary files
+        if files_to_delete:
+            remove_temp_files(files_to_delete)
 
     if json:
         results_dict = json_package.loads(df_diamond.to_json(orient="records"))
@@ -3,8 +3,9 @@ import numpy as np
 import os
 import json as json_package
 import re
+from functools import lru_cache
 
-from .utils import get_uniprot_seqs, tsv_to_df, set_up_logger
+from .utils import get_uniprot_seqs, tsv_to_df, tsv_parquet_path, set_up_logger
 
 logger = set_up_logger()
 
@@ -17,21 +18,148 @@ from .gget_setup import (
     ELM_INTDOMAINS_TSV,
 )
 
+# Valid characters in amino acid sequences and a translation table that deletes them
+AMINO_ACIDS = "ARNDCQEGHILKMFPSTWYVBZXJ"
+_DELETE_AMINO_ACIDS = str.maketrans("", "", AMINO_ACIDS)
 
-def motif_in_query(row):
+# Instance logic of ELM instances that are removed from the results
+EXCLUDED_INSTANCE_LOGIC = ["false positive", "true negative"]
+
+# New column names for the ELM interaction domains tsv file
+ELM_INTDOMAINS_COLUMNS = {
+    "ELM identifier": "ELMIdentifier",
+    "Interaction Domain Id": "InteractionDomainId",
+    "Interaction Domain Description": "InteractionDomainDescription",
+    "Interaction Domain Name": "InteractionDomainName",
+}
+
+
+def _read_elm_tsv(tsv_file, skiprows):
+    """
+    Read an ELM tsv file, preferring an up-to-date Parquet copy of it if one exists.
+    The Parquet copies are written by 'gget setup elm' right after downloading the files
+    (if pyarrow or fastparquet is installed; otherwise the tsv file is always read).
+
+    Args:
+    - tsv_file   Path to ELM tsv file
+    - skiprows   Number of lines to skip before the headers
+
+    Returns: data frame
+    """
+    parquet_file = tsv_parquet_path(tsv_file)
+
+    # Only use the Parquet copy if it is newer than the tsv file (e.g. not if writing it failed after a new download)
+    if os.path.exists(parquet_file) and os.path.getmtime(
+        parquet_file
+    ) >= os.path.getmtime(tsv_file):
+        try:
+            df = pd.read_parquet(parquet_file)
+        except (ImportError, OSError, ValueError):
+            # Fall back to the tsv file if no Parquet engine is installed or the Parquet copy cannot be read
+            # (pyarrow raises ArrowInvalid, a ValueError, for damaged files and OSError for I/O errors)
+            pass
+        else:
+            # Missing strings are read back as None, but read_csv returns NaN for them
+            object_cols = df.select_dtypes(include="object").columns
+            df[object_cols] = df[object_cols].where(df[object_cols].notna(), np.nan)
+            return df
+
+    # (pandas' C parser reads these files faster than csv.reader, even before
+    # the numeric columns would have to be converted)
+    return tsv_to_df(tsv_file, skiprows=skiprows)
+
+
+@lru_cache(maxsize=8)
+def _cached_tsv_to_df(tsv_file, skiprows, rename_columns, mtime):
+    # mtime is only part of the cache key so that modified files are read again
+    df = _read_elm_tsv(tsv_file, skiprows)
+    if rename_columns:
+        df = df.rename(columns=dict(rename_columns))
+    return df
+
+
+def load_elm_tsv(tsv_file, skiprows=None, rename_columns=None, copy=True):
+    """
+    Load a local ELM tsv file as a data frame.
+    Parsed files are cached, so each file is only read once per session (unless it was modified, e.g. by 'gget setup elm').
+
+    Args:
+    - tsv_file         Path to ELM tsv file
+    - skiprows         Number of lines to skip before the headers
+    - rename_columns   Dictionary of columns to rename
+    - copy             If False, returns the cached data frame itself, which is shared between calls
+                       and must not be modified in place (default: True)
+
+    Returns: data frame
+    """
+    if rename_columns:
+        rename_columns = tuple(rename_columns.items())
+    df = _cached_tsv_to_df(
+        tsv_file, skiprows, rename_columns, os.path.getmtime(tsv_file)
+    )
+    if copy:
+        return df.copy()
+    return df
+
+
+@lru_cache(maxsize=8)
+def _cached_tsv_row_index(tsv_file, skiprows, column, mtime):
+    df = load_elm_tsv(tsv_file, skiprows=skiprows, copy=False)
+    return df.groupby(column).indices
+
+
+def load_elm_tsv_index(tsv_file, column, skiprows=None):
+    """
+    Build a lookup from the values in one column of a local ELM tsv file to the positions of the rows containing them.
+    Like the parsed files, the lookup is built once per session.
+
+    Args:
+    - tsv_file   Path to ELM tsv file
+    - column     Column to index
+    - skiprows   Number of lines to skip before the headers
+
+    Returns: dictionary {value: array of row positions} (to be used with .iloc on the data frame returned by load_elm_tsv)
+    """
+    return _cached_tsv_row_index(tsv_file, skiprows, column, os.path.getmtime(tsv_file))
+
+
+@lru_cache(maxsize=8)
+def _cached_elm_regexes(tsv_file, skiprows, mtime):
+    df = load_elm_tsv(tsv_file, skiprows=skiprows, copy=False)
+    # The lookahead returns overlapping matches, the inner group captures the matched sequence
+    # (the patterns are matched on str: CPython stores ASCII strings with one byte per character,
+    # so matching on bytes instead is not faster)
+    return [re.compile(f"(?=({pattern}))") for pattern in df["Regex"]]
+
+
+def load_elm_regexes(tsv_file, skiprows=None):
     """
-    Checks if motif is in the overlapping region with the query sequence
+    Compile the regex patterns of all ELM classes in a local ELM classes tsv file.
+    Like the parsed files, the patterns are compiled once per session.
 
     Args:
-    row     - row in dataframe
+    - tsv_file   Path to ELM classes tsv file
+    - skiprows   Number of lines to skip before the headers
 
-    Returns: True if the motif is in between the subject start and end of sequence. False otherwise
+    Returns: list of compiled patterns (in the same order as the rows of the classes data frame)
     """
-    return (
-        True
-        if (row["motif_start_in_subject"] >= row["subject_start"])
-        & (row["motif_end_in_subject"] <= row["subject_end"])
-        else False
+    return _cached_elm_regexes(tsv_file, skiprows, os.path.getmtime(tsv_file))
+
+
+def motif_in_query(df):
+    """
+    Checks if motifs are in the overlapping region with the query sequence
+
+    Args:
+    df     - data frame with motif start/end and subject start/end columns
+
+    Returns: Boolean array that is True where the motif is in between the subject start and end of sequence. False otherwise
+    """
+    # Compare whole columns at once instead of applying a function to each row
+    motif_start = pd.to_numeric(df["motif_start_in_subject"], errors="coerce").values
+    motif_end = pd.to_numeric(df["motif_end_in_subject"], errors="coerce").values
+    return (motif_start >= df["subject_start"].values) & (
+        motif_end <= df["subject_end"].values
     )
 
 
@@ -46,10 +174,11 @@ def get_elm_instances(UniProtID):
     """
     # Get matching rows from elm_instances.tsv
     # ELM Instances.tsv file contains 5 lines before headers and data
-    df_full_instances = tsv_to_df(ELM_INSTANCES_TSV, skiprows=5)
-    df_instances_matching = df_full_instances[
-        df_full_instances["Primary_Acc"] == UniProtID
-    ]
+    # (rows are looked up by UniProt Acc instead of comparing the full accession column;
+    # the cached data frames are only read here, so they are not copied)
+    df_full_instances = load_elm_tsv(ELM_INSTANCES_TSV, skiprows=5, copy=False)
+    instance_rows = load_elm_tsv_index(ELM_INSTANCES_TSV, "Primary_Acc", skiprows=5)
+    df_instances_matching = df_full_instances.iloc[instance_rows.get(UniProtID, [])]
     # Rename columns
     df_instances_matching = df_instances_matching.rename(
         columns={
@@ -60,18 +189,16 @@ def get_elm_instances(UniProtID):
     )
 
     # Get class descriptions
-    df_classes = tsv_to_df(ELM_CLASSES_TSV, skiprows=5)
-    df_classes = df_classes.rename(columns={"Accession": "class_accession"})
+    df_classes = load_elm_tsv(
+        ELM_CLASSES_TSV,
+        skiprows=5,
+        rename_columns={"Accession": "class_accession"},
+        copy=False,
+    )
 
     # Get interaction domains
-    df_intdomains = tsv_to_df(ELM_INTDOMAINS_TSV)
-    df_intdomains = df_intdomains.rename(
-        columns={
-            "ELM identifier": "ELMIdentifier",
-            "Interaction Domain Id": "InteractionDomainId",
-            "Interaction Domain Description": "InteractionDomainDescription",
-            "Interaction Domain Name": "InteractionDomainName",
-        }
+    df_intdomains = load_elm_tsv(
+        ELM_INTDOMAINS_TSV, rename_columns=ELM_INTDOMAINS_COLUMNS, copy=False
     )
 
     # Merge data frames using ELM Identifier
@@ -105,24 +232,33 @@ def seq_workflow(
     diamond_binary   - Path to DIAMOND binary
 
     Returns: data frame consisting of ELM instances, class information, start, end in query, and if motif overlaps with subject sequence
+    (None if no orthologs were found)
     """
     if verbose:
         logger.info(
             f"ORTHO Performing pairwise sequence alignment against ELM database using DIAMOND for {len(sequences)} sequence(s)..."
         )
 
-    df = pd.DataFrame()
+    # Collect the data frames of all orthologs and concatenate them once at the end
+    # (concatenating inside the loop would copy the accumulated results each time)
+    frames = []
+
+    # Align all sequences with a single DIAMOND run
+    # (the query FASTA names the sequences Seq0, Seq1, ... in the order they were passed)
+    df_diamond_all = diamond(
+        query=list(sequences),
+        reference=reference,
+        sensitivity=sensitivity,
+        threads=threads,
+        verbose=verbose,
+        diamond_binary=diamond_binary,
+    )
+    hits_per_seq = df_diamond_all.groupby("query_accession", sort=False).indices
+
     seq_number = 1
     # for sequence, seq_len in zip(sequences, sequence_lengths):
     for sequence in sequences:
-        df_diamond = diamond(
-            query=sequence,
-            reference=reference,
-            sensitivity=sensitivity,
-            threads=threads,
-            verbose=verbose,
-            diamond_binary=diamond_binary,
-        )
+        df_diamond = df_diamond_all.iloc[hits_per_seq.get(f"Seq{seq_number - 1}", [])]
 
         if len(df_diamond) == 0:
             logger.warning(
@@ -141,32 +277,37 @@ def seq_workflow(
                     f"ORTHO Sequence {seq_number}/{len(sequences)}: DIAMOND found the following orthologous proteins: {', '.join(uniprot_ids)}. Retrieving ELMs for each UniProt Acc..."
                 )
 
-            for i, uniprot_id in enumerate(df_diamond["subject_accession"].values):
-                # print(f"UniProt Acc {uniprot_id}")
-                df_elm = get_elm_instances(str(uniprot_id).split("|")[1])
+            # Read each DIAMOND hit once as a record of scalars
+            for hit in df_diamond.to_dict("records"):
+                df_elm = get_elm_instances(str(hit["subject_accession"]).split("|")[1])
                 # missing motifs other than the first one
-                # df_elm["query_cover"] = df_diamond["length"].values[i] / seq_len * 100
-                df_elm["query_seq_length"] = df_diamond["query_seq_length"].values[i]
-                df_elm["subject_seq_length"] = df_diamond["subject_seq_length"].values[
-                    i
-                ]
-                df_elm["alignment_length"] = df_diamond["length"].values[i]
-                df_elm["identity_percentage"] = df_diamond[
-                    "identity_percentage"
-                ].values[i]
-                df_elm["query_start"] = int(df_diamond["query_start"].values[i])
-                df_elm["query_end"] = int(df_diamond["query_end"].values[i])
-                df_elm["subject_start"] = int(df_diamond["subject_start"].values[i])
-                df_elm["subject_end"] = int(df_diamond["subject_end"].values[i])
-                df_elm["motif_inside_subject_query_overlap"] = df_elm.apply(
-                    motif_in_query, axis=1
+                # df_elm["query_cover"] = hit["length"] / seq_len * 100
+                # Add the alignment information to all ELM instances of this hit in one step
+                df_elm = df_elm.assign(
+                    query_seq_length=hit["query_seq_length"],
+                    subject_seq_length=hit["subject_seq_length"],
+                    alignment_length=hit["length"],
+                    identity_percentage=hit["identity_percentage"],
+                    query_start=int(hit["query_start"]),
+                    query_end=int(hit["query_end"]),
+                    subject_start=int(hit["subject_start"]),
+                    subject_end=int(hit["subject_end"]),
                 )
 
-                df = pd.concat([df, df_elm])
+                # Hits without ELM instances do not add any rows
+                if len(df_elm) > 0:
+                    frames.append(df_elm)
 
         seq_number += 1
 
-    return df
+    if len(frames) == 0:
+        return None
+
+    df_final = pd.concat(frames, ignore_index=True)
+    # Check the motif positions of all hits with one vectorized comparison
+    df_final["motif_inside_subject_query_overlap"] = motif_in_query(df_final)
+
+    return df_final
 
 
 def regex_match(sequence):
@@ -177,57 +318,49 @@ def regex_match(sequence):
     sequence - user input sequence (can be either amino acid seq or UniProt Acc)
 
     Returns:
-    df_final - dataframe containing regex matches
-    TODO: Make sure this returns empty dataframe if no matches were found
+    df_final - dataframe containing regex matches (None if no matches were found)
     """
     # Get all motif regex patterns from elm db local file
-    df_elm_classes = tsv_to_df(ELM_CLASSES_TSV, skiprows=5)
-    df_full_instances = tsv_to_df(ELM_INSTANCES_TSV, skiprows=5)
-    df_full_intdomains = tsv_to_df(ELM_INTDOMAINS_TSV)
-    df_full_intdomains = df_full_intdomains.rename(
-        columns={
-            "ELM identifier": "ELMIdentifier",
-            "Interaction Domain Id": "InteractionDomainId",
-            "Interaction Domain Description": "InteractionDomainDescription",
-            "Interaction Domain Name": "InteractionDomainName",
-        }
+    # (the cached data frames are only read here, so they are not copied)
+    df_elm_classes = load_elm_tsv(ELM_CLASSES_TSV, skiprows=5, copy=False)
+    df_full_instances = load_elm_tsv(ELM_INSTANCES_TSV, skiprows=5, copy=False)
+    df_full_intdomains = load_elm_tsv(
+        ELM_INTDOMAINS_TSV, rename_columns=ELM_INTDOMAINS_COLUMNS, copy=False
     )
 
-    elm_ids = df_elm_classes["Accession"]
-    regex_patterns = df_elm_classes["Regex"]
+    # ELM regex patterns (compiled once per session)
+    regex_patterns = load_elm_regexes(ELM_CLASSES_TSV, skiprows=5)
 
-    df_final = pd.DataFrame()
+    # Record the ELM class (row position), matched sequence and position of each match
+    # (the data frame is only built once all matches were found)
+    class_idxs = []
+    matched_seqs = []
+    starts = []
+    ends = []
 
     # Compare ELM regex with input sequence and return all matching elms
-    for elm_id, pattern in zip(elm_ids, regex_patterns):
-        regex_matches = re.finditer(f"(?=({pattern}))", sequence)
-
-        for match_string in regex_matches:
-            elm_row = df_elm_classes[df_elm_classes["Accession"] == elm_id]
-            elm_row.insert(
-                loc=1,
-                column="Instances (Matched Sequence)",
-                value=match_string.group(1),
-            )
-
+    for class_idx, pattern in enumerate(regex_patterns):
+        for match_string in pattern.finditer(sequence):
             (start, end) = match_string.span(1)
-            elm_row.insert(loc=2, column="motif_start_in_query", value=int(start + 1))
-            elm_row.insert(loc=3, column="motif_end_in_query", value=int(end))
-
-            elm_identifier = [str(x) for x in elm_row["ELMIdentifier"]][0]
+            class_idxs.append(class_idx)
+            matched_seqs.append(match_string.group(1))
+            starts.append(int(start + 1))
+            ends.append(int(end))
 
-            # df_instances_matching = df_full_instances.loc[
-            #     df_full_instances["ELMIdentifier"] == elm_identifier
-            # ]
+    if len(class_idxs) == 0:
+        return None
 
-            # merge two dataframes using ELM Identifier, since some Accessions are missing from elm_instances.tsv
-            elm_row = elm_row.merge(df_full_instances, how="left", on="ELMIdentifier")
-            elm_row = elm_row.merge(df_full_intdomains, how="left", on="ELMIdentifier")
+    # One row per match with the information of the matching ELM class
+    df_final = df_elm_classes.iloc[class_idxs].reset_index(drop=True)
+    df_final.insert(loc=1, column="Instances (Matched Sequence)", value=matched_seqs)
+    df_final.insert(loc=2, column="motif_start_in_query", value=starts)
+    df_final.insert(loc=3, column="motif_end_in_query", value=ends)
 
-            df_final = pd.concat([df_final, elm_row])
+    # merge two dataframes using ELM Identifier, since some Accessions are missing from elm_instances.tsv
+    df_final = df_final.merge(df_full_instances, how="left", on="ELMIdentifier")
+    df_final = df_final.merge(df_full_intdomains, how="left", on="ELMIdentifier")
 
-    if len(df_final) > 0:
-        df_final.rename(columns={"Accession_x": "Instance_accession"}, inplace=True)
+    df_final.rename(columns={"Accession_x": "Instance_accession"}, inplace=True)
 
     return df_final
 
@@ -292,12 +425,12 @@ def elm(
 
     # Check validity of amino acid seq
     if not uniprot:
-        amino_acids = set("ARNDCQEGHILKMFPSTWYVBZXBJZ")
         # Convert input sequence to upper case letters
         sequence = sequence.upper()
 
         # If sequence is not a valid amino sequence, raise error
-        if not set(sequence) <= amino_acids:
+        # (any characters left after deleting all amino acids are invalid)
+        if sequence.translate(_DELETE_AMINO_ACIDS):
             logger.warning(
                 f"Input amino acid sequence contains invalid characters. If the input is a UniProt Acc, please use flag --uniprot (Python: uniprot=True)."
             )
@@ -305,35 +438,36 @@ def elm(
     # Build ortholog dataframe
     if verbose:
         logger.info(f"ORTHO Compiling ortholog information...")
-    ortho_df = pd.DataFrame()
+    ortho_df = None
     if uniprot:
-        ortho_df = get_elm_instances(sequence)
+        # Fetch the amino acid sequence(s) of the UniProt Acc once
+        # (used for the regex match below and if the UniProt Acc is not in the ELM database)
+        df_uniprot = get_uniprot_seqs(server=UNIPROT_REST_API, ensembl_ids=sequence)
+        if len(df_uniprot) > 0:
+            # Only grab sequences where IDs match exactly
+            aa_seqs = df_uniprot.loc[
+                df_uniprot["uniprot_id"] == sequence, "sequence"
+            ].to_numpy()
+        else:
+            aa_seqs = []
 
-        if len(ortho_df) == 0:
+        df_instances = get_elm_instances(sequence)
+
+        if len(df_instances) > 0:
+            ortho_df = df_instances
+        else:
             logger.warning(
-                "ORTHO The provided UniProt Accession does not match UniProt Accessions in the ELM database. Fetching amino acid sequence from UniProt..."
+                "ORTHO The provided UniProt Accession does not match UniProt Accessions in the ELM database. Using amino acid sequence from UniProt..."
             )
-            df_uniprot = get_uniprot_seqs(server=UNIPROT_REST_API, ensembl_ids=sequence)
-
-            if len(df_uniprot) > 0:
-                # Only grab sequences where IDs match exactly
-                aa_seqs = df_uniprot[df_uniprot["uniprot_id"] == sequence][
-                    "sequence"
-                ].values
-
-                if len(aa_seqs) == 0:
-                    raise ValueError(
-                        f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
-                    )
-
-                # seq_lens = [len(seq) for seq in aa_seqs]
 
-            else:
+            if len(aa_seqs) == 0:
                 raise ValueError(
                     f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
                 )
 
-    if len(ortho_df) == 0:
+            # seq_lens = [len(seq) for seq in aa_seqs]
+
+    if ortho_df is None:
         # Add input aa sequence and its length to list
         if not uniprot:
             aa_seqs = [sequence]
@@ -349,7 +483,7 @@ def elm(
             diamond_binary=diamond_binary,
         )
 
-        if len(ortho_df) == 0:
+        if ortho_df is None:
             logger.warning(
                 "ORTHO No ELM database orthologs found for input sequence or UniProt Acc."
             )
@@ -386,15 +520,14 @@ def elm(
         "#Instances",
         "#Instances_in_PDB",
     ]
-    for col in ortho_cols:
-        if col not in ortho_df.columns:
-            ortho_df[col] = np.nan
-
-    ortho_df = ortho_df[ortho_cols]
+    # Add missing columns (filled with NaN) and reorder in one step
+    if ortho_df is None:
+        ortho_df = pd.DataFrame(np.nan, index=pd.RangeIndex(0), columns=ortho_cols)
+    else:
+        ortho_df = ortho_df.reindex(columns=ortho_cols)
     # Remove false positives and true negatives
-    ortho_df = ortho_df[
-        (ortho_df["InstanceLogic"] != "false positive")
-        & (ortho_df["InstanceLogic"] != "true negative")
+    ortho_df = ortho_df.loc[
+        ~ortho_df["InstanceLogic"].isin(EXCLUDED_INSTANCE_LOGIC).to_numpy()
     ]
     # Drop duplicate rows and reset the index
     ortho_df = ortho_df.drop_duplicates().reset_index(drop=True)
@@ -404,35 +537,24 @@ def elm(
         logger.info(f"REGEX Finding regex motif matches...")
     fetch_aa_failed = False
     if uniprot:
-        # use amino acid sequence associated with UniProt Acc to do regex match
-
-        # do not fetch sequence again if already done above
-        if not "df_uniprot" in locals():
-            df_uniprot = get_uniprot_seqs(UNIPROT_REST_API, sequence)
-
-        if len(df_uniprot) > 0:
-            # Only grab sequences where IDs match exactly
-            sequences = df_uniprot[df_uniprot["uniprot_id"] == sequence][
-                "sequence"
-            ].values
-
-            if len(sequences) == 0:
+        # use amino acid sequence associated with UniProt Acc (fetched above) to do regex match
+        if len(aa_seqs) == 0:
+            logger.warning(
+                f"REGEX No amino acid sequences found for UniProt Acc {sequence} from the UniProt server."
+            )
+            fetch_aa_failed = True
+        else:
+            if len(aa_seqs) > 1:
                 logger.warning(
-                    f"REGEX No amino acid sequences found for UniProt Acc {sequence} from the UniProt server."
+                    f"REGEX More than one amino acid sequence found for UniProt Acc {sequence}. Using best match to find regex motifs."
                 )
-                fetch_aa_failed = True
-            else:
-                if len(sequences) > 1:
-                    logger.warning(
-                        f"REGEX More than one amino acid sequence found for UniProt Acc {sequence}. Using best match to find regex motifs."
-                    )
-                sequence = sequences[0]
-
-    df_regex_matches = pd.DataFrame()
+            sequence = aa_seqs[0]
+
+    df_regex_matches = None
     if not fetch_aa_failed:
         df_regex_matches = regex_match(sequence)
 
-    if len(df_regex_matches) == 0:
+    if df_regex_matches is None:
         logger.warning(
             "REGEX No regex matches found for input sequence or UniProt Acc."
         )
@@ -485,15 +607,16 @@ def elm(
             "#Instances_in_PDB",
         ]
 
-    for col in regex_cols:
-        if col not in df_regex_matches.columns:
-            df_regex_matches[col] = np.nan
-
-    df_regex_matches = df_regex_matches[regex_cols]
+    # Add missing columns (filled with NaN) and reorder in one step
+    if df_regex_matches is None:
+        df_regex_matches = pd.DataFrame(
+            np.nan, index=pd.RangeIndex(0), columns=regex_cols
+        )
+    else:
+        df_regex_matches = df_regex_matches.reindex(columns=regex_cols)
     # Remove false positives and true negatives
-    df_regex_matches = df_regex_matches[
-        (df_regex_matches["InstanceLogic"] != "false positive")
-        & (df_regex_matches["InstanceLogic"] != "true negative")
+    df_regex_matches = df_regex_matches.loc[
+        ~df_regex_matches["InstanceLogic"].isin(EXCLUDED_INSTANCE_LOGIC).to_numpy()
     ]
     # Drop duplicates and reset index
     df_regex_matches = df_regex_matches.drop_duplicates().reset_index(drop=True)
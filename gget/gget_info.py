@@ -244,17 +244,16 @@ def info(
                         )
 
                     ## Web scrape NCBI website for gene ID, synonyms and description
-                    soup = BeautifulSoup(html.text, "html.parser")
+                    # (lxml is a C parser and much faster than the pure-Python html.parser)
+                    soup = BeautifulSoup(html.text, "lxml")
 
                     # Check for error message in NCBI return
+                    error_tag = soup.find("li", class_="error icon")
                     if (
-                        soup.find("li", class_="error icon") is not None
-                        and "An error has occured"
-                        in soup.find("li", class_="error icon").text.strip()
+                        error_tag is not None
+                        and "An error has occured" in error_tag.text.strip()
                     ):
-                        error_message = soup.find(
-                            "li", class_="error icon"
-                        ).text.strip()
+                        error_message = error_tag.text.strip()
 
                         logger.error(
                             f"The NCBI server request for Ensembl ID '{ens_id}' returned the following error:\n{error_message}"
@@ -273,29 +272,24 @@ def info(
                     except AttributeError:
                         ncbi_gene_id = np.nan
 
+                    # Collect all fields of the summary section in one pass
+                    summary_fields = {}
+                    summary_div = soup.find("div", class_="section", id="summaryDiv")
+                    if summary_div is not None:
+                        for dt in summary_div.find_all("dt"):
+                            dd = dt.find_next_sibling("dd")
+                            # Keep the first occurence of each field
+                            if dd is not None and dt.string not in summary_fields:
+                                summary_fields[dt.string] = dd.text
+
                     # Check if NCBI description is available
-                    try:
-                        ncbi_description = (
-                            soup.find("div", class_="section", id="summaryDiv")
-                            .find("dt", string="Summary")
-                            .find_next_sibling("dd")
-                            .text
-                        )
-                    except AttributeError:
-                        ncbi_description = np.nan
+                    ncbi_description = summary_fields.get("Summary", np.nan)
 
                     # Check if NCBI synonyms are available
-                    try:
-                        ncbi_synonyms = (
-                            soup.find("div", class_="section", id="summaryDiv")
-                            .find("dt", string="Also known as")
-                            .find_next_sibling("dd")
-                            .text
-                        )
+                    ncbi_synonyms = summary_fields.get("Also known as")
+                    if ncbi_synonyms is not None:
                         # Split NCBI synonyms
                         ncbi_synonyms = ncbi_synonyms.split("; ")
-                    except AttributeError:
-                        ncbi_synonyms = None
 
                 except Exception as e:
                     logger.error(
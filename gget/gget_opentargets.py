@@ -1,7 +1,7 @@
 import json as json_
 import pandas as pd
 
-from .constants import OPENTARGETS_GRAPHQL_API
+from .constants import OPENTARGETS_GRAPHQL_API, OPENTARGETS_RESOURCES
 from .utils import set_up_logger, wrap_cols_func, graphql_query, json_list_to_df
 
 logger = set_up_logger()
@@ -647,5 +647,3 @@ _RESOURCES = {
         ),
     ),
 }
-
-OPENTARGETS_RESOURCES = list(_RESOURCES.keys())
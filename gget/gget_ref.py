@@ -1,6 +1,7 @@
-from bs4 import BeautifulSoup
-import requests
+from concurrent import futures
 import json
+import re
+import time
 
 # Custom functions
 from .utils import (
@@ -8,46 +9,117 @@ from .utils import (
     find_latest_ens_rel,
     find_nv_kingdom,
     set_up_logger,
+    FTP_SESSION,
 )
 
 logger = set_up_logger()
 
-from .constants import ENSEMBL_FTP_URL, ENSEMBL_FTP_URL_NV, ENSEMBL_FTP_URL_GRCH37
+from .constants import (
+    ENSEMBL_FTP_URL,
+    ENSEMBL_FTP_URL_NV,
+    ENSEMBL_FTP_URL_GRCH37,
+    ENSEMBL_SPECIES_SHORTCUTS,
+)
+
+# Number of seconds for which a fetched FTP directory listing is reused without contacting the server
+# (the listings only change with a new Ensembl release)
+FTP_CACHE_EXPIRE = 3600
+
+# In-memory cache of FTP directory listings keyed by URL
+_FTP_CACHE = {}
+
+# Matches an entry in an FTP directory listing and captures its link, date and size, e.g.
+# <td><a href="Homo_sapiens.GRCh38.112.gtf.gz">Homo_sapiens.GRCh38.112.gtf.gz</a></td><td align="right">2024-04-02 14:54  </td><td align="right"> 52M</td>
+FTP_LISTING_RE = re.compile(
+    r'<td[^>]*>\s*<a href="([^"]+)">[^<]*</a>\s*</td>\s*<td[^>]*>([^<]*)</td>\s*<td[^>]*>([^<]*)</td>'
+)
 
 
-def find_FTP_link(url, link_substring):
+def get_FTP_listing(url):
+    """
+    Helper function for gget ref to fetch the entries of an FTP directory listing.
+    The listing is streamed and parsed line by line, so only the parsed entries are kept in memory.
+    Successful responses are cached in memory. Once a cached listing is older than FTP_CACHE_EXPIRE seconds,
+    it is revalidated with a conditional request (ETag/Last-Modified), so that the listing is only
+    downloaded again if it changed.
+
+    Args:
+    url     - URL link to FTP subfolder
+
+    Returns the HTTP status code and a list of (link, date, size) tuples.
+    """
+    cached = _FTP_CACHE.get(url)
+    if cached is not None and time.time() - cached["time"] < FTP_CACHE_EXPIRE:
+        return 200, cached["entries"]
+
+    headers = {}
+    if cached is not None:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with FTP_SESSION.get(url, headers=headers, stream=True) as html:
+        # Listing has not changed since it was cached
+        if html.status_code == 304 and cached is not None:
+            cached["time"] = time.time()
+            return 200, cached["entries"]
+
+        if html.status_code != 200:
+            return html.status_code, []
+
+        # Fall back to UTF-8 if the server does not define an encoding (iter_lines would return bytes otherwise)
+        html.encoding = html.encoding or "utf-8"
+        entries = []
+        for line in html.iter_lines(decode_unicode=True):
+            entries.extend(FTP_LISTING_RE.findall(line))
+
+        _FTP_CACHE[url] = {
+            "time": time.time(),
+            "etag": html.headers.get("ETag"),
+            "last_modified": html.headers.get("Last-Modified"),
+            "entries": entries,
+        }
+
+    return 200, entries
+
+
+def find_FTP_link(url, link_substrings, allow_missing=False):
     """
     Helper function for gget ref to find an FTP link, its release date and size.
 
     Args:
     url             - URL link to FTP subfolder (e.g. GTF) including species and release
-    link_to_find    - Unique substring to identify link to find
+    link_substrings - List of unique substrings to identify the link to find.
+                      The substrings are tried in order until a matching link is found.
+    allow_missing   - If True, returns None for all values instead of raising an error when
+                      the FTP subfolder does not exist (default: False).
 
     Returns the link, date, and size as strings.
     """
-    html = requests.get(url)
+    # Get all (link, date, size) entries from the website
+    status_code, entries = get_FTP_listing(url)
 
     # Raise error if status code not "OK" Response
-    if html.status_code != 200:
+    if status_code != 200:
+        if allow_missing:
+            return None, None, None
         raise RuntimeError(
-            f"HTTP response status code {html.status_code}. Please try again.\n"
+            f"HTTP response status code {status_code}. Please try again.\n"
         )
 
-    soup = BeautifulSoup(html.text, "html.parser")
-
-    link_str = None
-    date_str = None
-    size_str = None
+    for link_substring in link_substrings:
+        # Find the correct link (if several links match, the last one is used)
+        link_str, date_str, size_str = next(
+            (entry for entry in reversed(entries) if link_substring in entry[0]),
+            (None, None, None),
+        )
 
-    # Get all entries from the website
-    links = [stuff.text.strip() for stuff in soup.findAll("td")]
-    for i, link in enumerate(links):
-        # Find the correct link
-        if link_substring in link:
-            link_str = link
-            # Get date and size
-            date_str = links[i + 1]
-            size_str = links[i + 2]
+        if link_str is not None:
+            # Remove padding around date and size
+            date_str = date_str.strip()
+            size_str = size_str.strip()
+            break
 
     return link_str, date_str, size_str
 
@@ -170,10 +242,7 @@ def ref(
 
     # Species shortcuts
     grch37 = False
-    if species == "human":
-        species = "homo_sapiens"
-    if species == "mouse":
-        species = "mus_musculus"
+    species = ENSEMBL_SPECIES_SHORTCUTS.get(species, species)
     if species == "human_grch37":
         species = "homo_sapiens"
         grch37 = True
@@ -182,21 +251,27 @@ def ref(
     species = species.lower()
 
     # GRCh37 database (releases same as standard database)
+    species_list_dna = None
     if grch37:
         database = ENSEMBL_FTP_URL_GRCH37
         ENS_rel = find_latest_ens_rel(ENSEMBL_FTP_URL)
-    # Standard database
-    elif species in ref_species_options(
-        "dna", database=ENSEMBL_FTP_URL, release=release
-    ):
-        database = ENSEMBL_FTP_URL
-        # Find latest vertebrate Ensembl release
-        ENS_rel = find_latest_ens_rel(database)
-    # For non-vertebrates, switch to non-vertebrate databases
     else:
-        database = ENSEMBL_FTP_URL_NV
-        # Find latest NV Ensembl release
-        ENS_rel = find_latest_ens_rel(database)
+        # Find all available vertebrate species for genome FASTAs
+        vertebrate_species_list_dna = ref_species_options(
+            "dna", database=ENSEMBL_FTP_URL, release=release
+        )
+        # Standard database
+        if species in vertebrate_species_list_dna:
+            database = ENSEMBL_FTP_URL
+            # The species were fetched for the same release that is used below, so they can be reused
+            species_list_dna = vertebrate_species_list_dna
+            # Find latest vertebrate Ensembl release
+            ENS_rel = find_latest_ens_rel(database)
+        # For non-vertebrates, switch to non-vertebrate databases
+        else:
+            database = ENSEMBL_FTP_URL_NV
+            # Find latest NV Ensembl release
+            ENS_rel = find_latest_ens_rel(database)
 
     # If release != None, use user-defined Ensembl release
     if release != None:
@@ -209,14 +284,20 @@ def ref(
 
     if not grch37:
         ## Raise error if species not found (both FASTA and GTF have to be available)
-        # Find all available species for genome FASTAs for this Ensembl release
-        species_list_dna = ref_species_options(
-            "dna", database=database, release=ENS_rel
-        )
-        # Find all available species for GTFs for this Ensembl release
-        species_list_gtf = ref_species_options(
-            "gtf", database=database, release=ENS_rel
-        )
+        # The species lists are independent of each other, so they are fetched concurrently
+        with futures.ThreadPoolExecutor(2) as ex:
+            # Find all available species for GTFs for this Ensembl release
+            f_gtf = ex.submit(
+                ref_species_options, "gtf", database=database, release=ENS_rel
+            )
+            # Find all available species for genome FASTAs for this Ensembl release (if not already fetched above)
+            if species_list_dna is None:
+                f_dna = ex.submit(
+                    ref_species_options, "dna", database=database, release=ENS_rel
+                )
+                species_list_dna = f_dna.result()
+            species_list_gtf = f_gtf.result()
+
         # Find intersection of the two lists
         # (Only species which have GTF and FASTAs available can continue)
         species_list = list(set(species_list_gtf) & set(species_list_dna))
@@ -232,158 +313,69 @@ def ref(
     if database == ENSEMBL_FTP_URL_NV:
         kingdom = find_nv_kingdom(species, release=ENS_rel)
 
-    ## Get GTF link for this species and release
-    if "all" in which or "gtf" in which:
-        # Define location of GTF links
-        if database == ENSEMBL_FTP_URL_NV:
-            gtf_search_url = database + f"release-{ENS_rel}/{kingdom}/gtf/{species}/"
-        else:
-            gtf_search_url = database + f"release-{ENS_rel}/gtf/{species}/"
-
-        if grch37:
-            link_substring = "GRCh37.87.gtf.gz"
-        else:
-            link_substring = f"{ENS_rel}.gtf.gz"
-
-        # Get link, release date and dataset size
-        gtf_str, gtf_date, gtf_size = find_FTP_link(
-            url=gtf_search_url, link_substring=link_substring
-        )
-        # Build the final download link
-        if not isinstance(gtf_str, type(None)):
-            gtf_url = gtf_search_url + gtf_str
-        else:
-            gtf_url = ""
-            gtf_date = " "
-            gtf_size = ""
-
-    ## Get cDNA FASTA link for this species and release
-    if "all" in which or "cdna" in which:
-        if database == ENSEMBL_FTP_URL_NV:
-            # Define location of cdna links
-            cdna_search_url = (
-                database + f"release-{ENS_rel}/{kingdom}/fasta/{species}/cdna/"
-            )
-        else:
-            # Define location of cdna links
-            cdna_search_url = database + f"release-{ENS_rel}/fasta/{species}/cdna/"
-
-        # Get link, release date and dataset size
-        cdna_str, cdna_date, cdna_size = find_FTP_link(
-            url=cdna_search_url, link_substring="cdna.all.fa"
-        )
-        # Build the final download link
-        if not isinstance(cdna_str, type(None)):
-            cdna_url = cdna_search_url + cdna_str
-        else:
-            cdna_url = ""
-            cdna_date = " "
-            cdna_size = ""
-
-    ## Get DNA FASTA link for this species and release
-    if "all" in which or "dna" in which:
-        # Define location of dna links
-        if database == ENSEMBL_FTP_URL_NV:
-            dna_search_url = (
-                database + f"release-{ENS_rel}/{kingdom}/fasta/{species}/dna/"
-            )
-        else:
-            dna_search_url = database + f"release-{ENS_rel}/fasta/{species}/dna/"
-        # Get link, release date and dataset size
-        dna_str, dna_date, dna_size = find_FTP_link(
-            url=dna_search_url, link_substring=".dna.primary_assembly.fa"
-        )
+    ## Find FTP links for this species and release
+    # Define location of the FTP links
+    if database == ENSEMBL_FTP_URL_NV:
+        release_url = database + f"release-{ENS_rel}/{kingdom}/"
+    else:
+        release_url = database + f"release-{ENS_rel}/"
 
-        # Get toplevel if primary assembly not available
-        if dna_str is None:
-            # Get link, release date and dataset size
-            dna_str, dna_date, dna_size = find_FTP_link(
-                url=dna_search_url, link_substring=".dna.toplevel.fa"
+    if grch37:
+        gtf_substring = "GRCh37.87.gtf.gz"
+    else:
+        gtf_substring = f"{ENS_rel}.gtf.gz"
+
+    # URL of the FTP subfolder and substring(s) identifying the link for each type of file
+    # (substrings are tried in order, e.g. the toplevel genome is used if the primary assembly is not available)
+    ftp_searches = {
+        "gtf": (release_url + f"gtf/{species}/", [gtf_substring]),
+        "cdna": (release_url + f"fasta/{species}/cdna/", ["cdna.all.fa"]),
+        "dna": (
+            release_url + f"fasta/{species}/dna/",
+            [".dna.primary_assembly.fa", ".dna.toplevel.fa"],
+        ),
+        "cds": (release_url + f"fasta/{species}/cds/", ["cds.all.fa"]),
+        "ncrna": (release_url + f"fasta/{species}/ncrna/", [".ncrna.fa"]),
+        "pep": (release_url + f"fasta/{species}/pep/", [".pep.all.fa"]),
+    }
+    if "all" not in which:
+        ftp_searches = {
+            ftp_type: ftp_search
+            for ftp_type, ftp_search in ftp_searches.items()
+            if ftp_type in which
+        }
+
+    # The FTP subfolders are independent of each other, so they are fetched concurrently
+    # (at least one worker, since the executor does not accept 0 workers if nothing is requested)
+    with futures.ThreadPoolExecutor(max(1, len(ftp_searches))) as ex:
+        fs = {
+            ftp_type: ex.submit(
+                find_FTP_link,
+                url=search_url,
+                link_substrings=link_substrings,
+                # If ncRNA data is not available, I will assume that the HTML request returns an error code
+                allow_missing=ftp_type == "ncrna",
             )
+            for ftp_type, (search_url, link_substrings) in ftp_searches.items()
+        }
 
+    ftp_results = {}
+    for ftp_type, f in fs.items():
+        link_str, date_str, size_str = f.result()
         # Build the final download link
-        if not isinstance(dna_str, type(None)):
-            dna_url = dna_search_url + dna_str
-        else:
-            dna_url = ""
-            dna_date = " "
-            dna_size = ""
-
-    ## Get CDS FASTA link for this species and release
-    if "all" in which or "cds" in which:
-        # Define location of cds links
-        if database == ENSEMBL_FTP_URL_NV:
-            cds_search_url = (
-                database + f"release-{ENS_rel}/{kingdom}/fasta/{species}/cds/"
-            )
-        else:
-            cds_search_url = database + f"release-{ENS_rel}/fasta/{species}/cds/"
-        # Get link, release date and dataset size
-        cds_str, cds_date, cds_size = find_FTP_link(
-            url=cds_search_url, link_substring="cds.all.fa"
-        )
-        # Build the final download link
-        if not isinstance(cds_str, type(None)):
-            cds_url = cds_search_url + cds_str
-        else:
-            cds_url = ""
-            cds_date = " "
-            cds_size = ""
-
-    ## Get ncRNA FASTA link for this species and release (if available)
-    if "all" in which or "ncrna" in which:
-        # Define location of ncRNA links
-        if database == ENSEMBL_FTP_URL_NV:
-            ncrna_search_url = (
-                database + f"release-{ENS_rel}/{kingdom}/fasta/{species}/ncrna/"
+        if link_str is not None:
+            ftp_results[ftp_type] = (
+                ftp_searches[ftp_type][0] + link_str,
+                date_str,
+                size_str,
             )
-        else:
-            ncrna_search_url = database + f"release-{ENS_rel}/fasta/{species}/ncrna/"
-
-        html = requests.get(ncrna_search_url)
-
-        # If ncRNA data is not available, HTML requests returns an error code (!= 200)
-        if html.status_code == 200:
-            soup = BeautifulSoup(html.text, "html.parser")
-
-            # Get all entries from the website
-            links = [stuff.text.strip() for stuff in soup.findAll("td")]
-            for i, link in enumerate(links):
-                # Find the correct link
-                if ".ncrna.fa" in link:
-                    ncrna_str = link
-                    # Get date and size
-                    ncrna_date = links[i + 1]
-                    ncrna_size = links[i + 2]
 
-            ncrna_url = ncrna_search_url + ncrna_str
-
-        # If the HTML request returned an error code here, I will assume that ncRNA data is not available
-        else:
-            ncrna_url = ""
-            ncrna_date = " "
-            ncrna_size = ""
-
-    ## Get pep FASTA link for this species and release
-    if "all" in which or "pep" in which:
-        # Define location of pep links
-        if database == ENSEMBL_FTP_URL_NV:
-            pep_search_url = (
-                database + f"release-{ENS_rel}/{kingdom}/fasta/{species}/pep/"
-            )
-        else:
-            pep_search_url = database + f"release-{ENS_rel}/fasta/{species}/pep/"
-        # Get link, release date and dataset size
-        pep_str, pep_date, pep_size = find_FTP_link(
-            url=pep_search_url, link_substring=".pep.all.fa"
-        )
-        # Build the final download link
-        if not isinstance(pep_str, type(None)):
-            pep_url = pep_search_url + pep_str
-        else:
-            pep_url = ""
-            pep_date = " "
-            pep_size = ""
+    gtf_url, gtf_date, gtf_size = ftp_results.get("gtf", ("", " ", ""))
+    cdna_url, cdna_date, cdna_size = ftp_results.get("cdna", ("", " ", ""))
+    dna_url, dna_date, dna_size = ftp_results.get("dna", ("", " ", ""))
+    cds_url, cds_date, cds_size = ftp_results.get("cds", ("", " ", ""))
+    ncrna_url, ncrna_date, ncrna_size = ftp_results.get("ncrna", ("", " ", ""))
+    pep_url, pep_date, pep_size = ftp_results.get("pep", ("", " ", ""))
 
     ## Return results
     # If FTP=False, return dictionary/json of specified results
@@ -1,7 +1,10 @@
 import numpy as np
 import pandas as pd
 import json as json_package
-import mysql.connector as sql
+from collections import OrderedDict
+import mysql.connector
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
 import time
 import warnings
 
@@ -13,12 +16,132 @@ from .utils import (
     find_latest_ens_rel,
     wrap_cols_func,
     find_nv_kingdom,
+    flatten,
     set_up_logger,
 )
 
 logger = set_up_logger()
 
-from gget.constants import ENSEMBL_FTP_URL, ENSEMBL_FTP_URL_NV
+from gget.constants import (
+    ENSEMBL_FTP_URL,
+    ENSEMBL_FTP_URL_NV,
+    ENSEMBL_SPECIES_SHORTCUTS,
+)
+
+# Public Ensembl SQL server
+ENSEMBL_SQL_HOST = "mysql-eg-publicsql.ebi.ac.uk"
+# Ports to try when connecting to the Ensembl SQL server (some databases are stored in different ports)
+# 3306 (and 5306) for the Ensembl instances, 3337 for GRCh37, 4157 for Ensembl Genomes, and 5316 for mart
+ENSEMBL_SQL_PORTS = [3306, 5306, 4157, 3337, 5316]
+# Number of connections kept open per database
+# (further concurrent searches against the same database open a separate connection)
+ENSEMBL_SQL_POOL_SIZE = 1
+
+# Number of searches whose results are kept in memory
+SEARCH_CACHE_SIZE = 128
+
+# Results of previous searches keyed by the normalized search arguments (least recently used first)
+_SEARCH_CACHE = OrderedDict()
+
+# Connection pools to the Ensembl SQL server and the ports they connect to, keyed by database name
+_POOLS = {}
+_POOL_PORTS = {}
+
+
+def get_connection_pool(db):
+    """
+    Helper function for gget search to get a connection pool for an Ensembl core database.
+    The pool is created on the first call and reused afterwards, so that repeated searches
+    against the same database do not have to set up a new connection each time.
+
+    Args:
+    db      - Name of the Ensembl core database, e.g. "homo_sapiens_core_105_38"
+
+    Returns a mysql.connector MySQLConnectionPool.
+    """
+    if db in _POOLS:
+        return _POOLS[db]
+
+    last_exception = None
+    for port in ENSEMBL_SQL_PORTS:
+        try:
+            pool = MySQLConnectionPool(
+                # Pool names are limited to 64 characters
+                pool_name=f"gget_{db}"[:64],
+                pool_size=ENSEMBL_SQL_POOL_SIZE,
+                host=ENSEMBL_SQL_HOST,
+                database=db,
+                user="anonymous",
+                password="",
+                port=port,
+            )
+            _POOLS[db] = pool
+            _POOL_PORTS[db] = port
+            return pool
+        except Exception as e:
+            last_exception = e
+            # Continue to the next port if the connection is unsuccessful
+            continue
+
+    # If none of the ports work, raise an error with the last exception encountered
+    if "Access denied" in str(last_exception):
+        raise RuntimeError(
+            f"""
+            The Ensembl server returned the following error: {str(last_exception)}.
+            This might be caused by the Ensembl release number being too low. 
+            Please try again with a more recent release.
+            """
+        )
+    else:
+        raise RuntimeError(
+            f"The Ensembl server returned the following error: {str(last_exception)}"
+        )
+
+
+def get_connection(db):
+    """
+    Helper function for gget search to get a connection to an Ensembl core database.
+    Connections are taken from the pool of the database (see get_connection_pool). The pool does not
+    wait for connections to be returned, so if all pooled connections are in use (e.g. by searches
+    running in other threads), a separate connection is opened instead.
+
+    Args:
+    db      - Name of the Ensembl core database, e.g. "homo_sapiens_core_105_38"
+
+    Returns a mysql.connector connection (closing it returns pooled connections to the pool).
+    """
+    pool = get_connection_pool(db)
+    try:
+        return pool.get_connection()
+    except PoolError:
+        return mysql.connector.connect(
+            host=ENSEMBL_SQL_HOST,
+            database=db,
+            user="anonymous",
+            password="",
+            port=_POOL_PORTS[db],
+        )
+
+
+def copy_search_results(df):
+    """
+    Helper function for gget search to copy a data frame of search results, including the lists
+    stored in its cells (e.g. synonyms), which DataFrame.copy() does not copy.
+    Used to keep the cached results separate from the results returned to the user.
+
+    Args:
+    df      - Data frame returned by fetch_search_results
+
+    Returns a data frame.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = [
+                list(value) if isinstance(value, list) else value
+                for value in df[col].values
+            ]
+    return df
 
 
 def clean_cols(x):
@@ -43,93 +166,18 @@ def clean_cols(x):
         return x
 
 
-def search(
-    searchwords,
-    species,
-    release=None,
-    id_type="gene",
-    seqtype=None,
-    andor="or",
-    limit=None,
-    wrap_text=False,
-    json=False,
-    save=False,
-    verbose=True,
+def fetch_search_results(
+    searchwords, species, release, id_type, andor, limit, match_mode, verbose
 ):
     """
-    Function to query Ensembl for genes based on species and free form search terms.
-    Automatically fetches results from latest Ensembl release, unless user specifies database (see 'species' argument)
-    or release database (see 'release' argument).
-
-    Args:
-    - searchwords     Free form search words (not case-sensitive) as a string or list of strings
-                      (e.g.searchwords = ["GABA", "gamma-aminobutyric"]).
-    - species         Species can be passed in the format "genus_species", e.g. "homo_sapiens" or "arabidopsis_thaliana".
-                      To pass a specific database, enter the name of the core database, e.g. "mus_musculus_dba2j_core_105_1".
-                      All available core databases can be found here:
-                      Vertebrates: http://ftp.ensembl.org/pub/current/mysql/
-                      Invertebrates: http://ftp.ensemblgenomes.org/pub/current/ + kingdom + mysql/
-    - release         Defines the Ensembl release number from which the files are fetched, e.g. 104.
-                      Note: This argument does not apply to invertebrate species (you can pass a specific core database (which includes release number) to the species argument instead).
-                      This argument is overwritten if a specific database (which includes a release number) is passed to the species argument.
-                      Default: None -> latest Ensembl release is used
-    - id_type         "gene" (default) or "transcript"
-                      Defines whether genes or transcripts matching the searchwords are returned.
-    - andor           "or" (default) or "and"
-                      "or": Returns all genes that INCLUDE AT LEAST ONE of the searchwords in their name/description.
-                      "and": Returns only genes that INCLUDE ALL of the searchwords in their name/description.
-    - limit           (int) Limit the number of search results returned (default: None).
-    - wrap_text       If True, displays data frame with wrapped text for easy reading. Default: False.
-    - json            If True, returns results in json format instead of data frame. Default: False.
-    - save            If True, the data frame is saved as a csv in the current directory (default: False).
-    - verbose         True/False whether to print progress information. Default True.
+    Helper function for gget search to find the Ensembl database for a species and fetch the matching genes/transcripts.
+    Arguments are validated and cleaned up by gget search.
 
     Returns a data frame with the query results.
-
-    Note: Only returns results based on matches in the "gene name" or "description" sections in the Ensembl database.
-
-    Deprecated arguments: 'seqtype' (renamed to id_type)
     """
-    # Handle deprecated arguments
-    if seqtype:
-        logger.error(
-            "'seqtype' argument deprecated! Please use argument 'id_type' instead."
-        )
-        return
-
     start_time = time.time()
 
-    ## Check validity or arguments
-    # Check if id_type is valid
-    id_types = ["gene", "transcript"]
-    id_type = id_type.lower()
-    if id_type not in id_types:
-        raise ValueError(
-            f"ID type (id_type) specified is '{id_type}'. Expected one of: {', '.join(id_types)}"
-        )
-
-    # Check if 'andor' arg is valid
-    andors = ["and", "or"]
-    andor = andor.lower()
-    if andor not in andors:
-        raise ValueError(
-            f"'andor' argument specified as {andor}. Expected one of {', '.join(andors)}"
-        )
-
     ## Get database for specified species
-    # Species shortcuts
-    if species == "human":
-        species = "homo_sapiens"
-    if species == "mouse":
-        species = "mus_musculus"
-
-    # If a specific database is passed with the "/" at the end, remove it
-    if "/" in species:
-        species = species.split("/")[0]
-
-    # In case species was passed with upper case letters
-    species = species.lower()
-
     if "core" in species:
         db = species
         if release:
@@ -196,123 +244,97 @@ def search(
     if verbose:
         logger.info(f"Fetching results from database: {db}")
 
-    ## Connect to Ensembl SQL server data for specified species
-    # Ports to try (some databases are stored in different ports)
-    # 3306 (and 5306) for the Ensembl instances, 3337 for GRCh37, 4157 for Ensembl Genomes, and 5316 for mart
-    ports = [3306, 5306, 4157, 3337, 5316]
-
-    connection_successful = False
-    last_exception = None
-    for port in ports:
-        try:
-            db_connection = sql.connect(
-                host="mysql-eg-publicsql.ebi.ac.uk",
-                database=db,
-                user="anonymous",
-                password="",
-                port=port,
-            )
-            connection_successful = True
-            break
-        except Exception as e:
-            last_exception = e
-            # Continue to the next port if the connection is unsuccessful
-            continue
+    ## Build the query for genes or transcripts
+    # (the gene and transcript tables share the same layout, so a single template covers both)
+    select_clause = f"""
+        SELECT DISTINCT {id_type}.stable_id AS ensembl_id, xref.display_label AS gene_name, {id_type}.description AS ensembl_description, xref.description AS ext_ref_description, {id_type}.biotype AS biotype, external_synonym.synonym AS synonym
+        """
+    from_clause = f"""
+        FROM {id_type} 
+        LEFT JOIN xref ON {id_type}.display_xref_id = xref.xref_id 
+        LEFT JOIN external_synonym ON {id_type}.display_xref_id = external_synonym.xref_id 
+        LEFT JOIN {id_type}_attrib ON {id_type}.{id_type}_id = {id_type}_attrib.{id_type}_id 
+        """
+    search_cols = [
+        f"{id_type}.description",
+        "xref.description",
+        "xref.display_label",
+        "external_synonym.synonym",
+        f"{id_type}_attrib.value",
+    ]
 
-    # If none of the ports work, raise an error with the last exception encountered
-    if not connection_successful:
-        if "Access denied" in str(last_exception):
-            raise RuntimeError(
-                f"""
-                The Ensembl server returned the following error: {str(last_exception)}.
-                This might be caused by the Ensembl release number being too low. 
-                Please try again with a more recent release.
-                """
-            )
-        else:
-            raise RuntimeError(
-                f"The Ensembl server returned the following error: {str(last_exception)}"
+    # Condition matching a single searchword in any of the searched columns
+    # (searchwords are passed as query parameters instead of being pasted into the query)
+    searchword_condition = (
+        "(" + " OR ".join([f"{col} LIKE %s" for col in search_cols]) + ")"
+    )
+    # Substring matches allow any characters before the searchword, prefix matches do not
+    if match_mode == "substring":
+        patterns = [f"%{searchword}%" for searchword in searchwords]
+    if match_mode == "prefix":
+        patterns = [f"{searchword}%" for searchword in searchwords]
+    params = flatten([[pattern] * len(search_cols) for pattern in patterns])
+
+    # Fetch the results for all searchwords with a single query (one round trip to the server)
+    # Duplicate rows (e.g. from genes with several attributes) are removed on the server by SELECT DISTINCT
+    if andor == "or":
+        # Keep all results matching at least one of the searchwords
+        where_clause = " OR ".join([searchword_condition] * len(searchwords))
+    if andor == "and":
+        # Keep results matching the first searchword whose ID also matches all other searchwords
+        where_clause = searchword_condition
+        for _ in searchwords[1:]:
+            where_clause += f" AND {id_type}.stable_id IN (SELECT {id_type}.stable_id {from_clause} WHERE {searchword_condition})"
+
+    query = select_clause + from_clause + f"WHERE ({where_clause})"
+
+    # Query counting all matching IDs, which is only needed to report the total number of matches
+    # when the results are limited (the limited results are never fetched in full)
+    count_query = None
+    count_params = params
+    if limit != None and verbose:
+        count_query = f"SELECT COUNT(DISTINCT {id_type}.stable_id) {from_clause} WHERE ({where_clause})"
+
+    # If limit is not None, only fetch the first {limit} IDs (ordered by ID)
+    # The limit is applied to the matching IDs rather than to the returned rows,
+    # since each ID can be spread over several rows (e.g. one per synonym)
+    if limit != None:
+        query += f"""
+            AND {id_type}.stable_id IN (
+                SELECT stable_id FROM (
+                    SELECT DISTINCT {id_type}.stable_id {from_clause}
+                    WHERE ({where_clause})
+                    ORDER BY {id_type}.stable_id
+                    LIMIT %s
+                ) AS limited_ids
             )
-
-    ## Clean up list of searchwords
-    # If single searchword passed as string, convert to list
-    if type(searchwords) == str:
-        searchwords = [searchwords]
-
-    ## Find genes
-    for i, searchword in enumerate(searchwords):
-        if id_type == "gene":
-            query = f"""
-            SELECT gene.stable_id AS 'ensembl_id', xref.display_label AS 'gene_name', gene.description AS 'ensembl_description', xref.description AS 'ext_ref_description', gene.biotype AS 'biotype', external_synonym.synonym AS 'synonym'
-            FROM gene 
-            LEFT JOIN xref ON gene.display_xref_id = xref.xref_id 
-            LEFT JOIN external_synonym ON gene.display_xref_id = external_synonym.xref_id 
-            LEFT JOIN gene_attrib ON gene.gene_id = gene_attrib.gene_id 
-            WHERE (gene.description LIKE '%{searchword}%' OR xref.description LIKE '%{searchword}%' OR xref.display_label LIKE '%{searchword}%' OR external_synonym.synonym LIKE '%{searchword}%' OR gene_attrib.value LIKE '%{searchword}%')
             """
+        params = params + params + [int(limit)]
 
-            # Fetch the search results from the host using the specified query
-            df_temp = pd.read_sql(query, con=db_connection)
-
-            # Order by ENSEMBL ID (I am using pandas for this instead of SQL to increase speed)
-            df_temp = df_temp.sort_values("ensembl_id").reset_index(drop=True)
-
-            # If andor="or", keep all results
-            if andor == "or":
-                # In the first iteration, make the search results equal to the master data frame
-                if i == 0:
-                    df = df_temp.copy()
-                # Add new search results to master data frame
-                else:
-                    df = pd.concat([df, df_temp])
-
-            # If andor="and", only keep overlap between results
-            if andor == "and":
-                # In the first iteration, make the search results equal to the master data frame
-                if i == 0:
-                    df = df_temp.copy()
-                # Only keep overlapping results in master data frame
-                else:
-                    val = np.intersect1d(df["ensembl_id"], df_temp["ensembl_id"])
-                    df = df[df.ensembl_id.isin(val)]
-
-        if id_type == "transcript":
-            query = f"""
-            SELECT transcript.stable_id AS 'ensembl_id', xref.display_label AS 'gene_name', transcript.description AS 'ensembl_description', xref.description AS 'ext_ref_description', transcript.biotype AS 'biotype', external_synonym.synonym AS 'synonym'
-            FROM transcript 
-            LEFT JOIN xref ON transcript.display_xref_id = xref.xref_id 
-            LEFT JOIN external_synonym ON transcript.display_xref_id = external_synonym.xref_id 
-            LEFT JOIN transcript_attrib ON transcript.transcript_id = transcript_attrib.transcript_id 
-            WHERE (transcript.description LIKE '%{searchword}%' OR xref.description LIKE '%{searchword}%' OR xref.display_label LIKE '%{searchword}%' OR external_synonym.synonym LIKE '%{searchword}%' OR transcript_attrib.value LIKE '%{searchword}%')
-            """
+    ## Connect to Ensembl SQL server data for specified species
+    # (connections are taken from a pool that is kept open across calls)
+    db_connection = get_connection(db)
 
-            # Fetch the search results from the host using the specified query
-            df_temp = pd.read_sql(query, con=db_connection)
-            # Order by ENSEMBL ID (I am using pandas for this instead of SQL to increase speed)
-            df_temp = df_temp.sort_values("ensembl_id").reset_index(drop=True)
-
-            # If andor="or", keep all results
-            if andor == "or":
-                # In the first iteration, make the search results equal to the master data frame
-                if i == 0:
-                    df = df_temp.copy()
-                # Add new search results to master data frame
-                else:
-                    df = pd.concat([df, df_temp])
-            # If andor="and", only keep overlap between results
-            if andor == "and":
-                # In the first iteration, make the search results equal to the master data frame
-                if i == 0:
-                    df = df_temp.copy()
-                # Only keep overlapping results in master data frame
-                else:
-                    val = np.intersect1d(df["ensembl_id"], df_temp["ensembl_id"])
-                    df = df[df.ensembl_id.isin(val)]
-
-    # Remove any duplicate search results from the master data frame and reset the index
-    df = df.drop_duplicates().reset_index(drop=True)
+    # Fetch the search results from the host using the specified query
+    # (The rows are read with a plain cursor, which avoids the overhead of pd.read_sql for non-SQLAlchemy connections)
+    cursor = None
+    try:
+        cursor = db_connection.cursor()
+        cursor.execute(query, tuple(params))
+        df = pd.DataFrame(
+            cursor.fetchall(), columns=[col[0] for col in cursor.description]
+        )
+        if count_query is not None:
+            cursor.execute(count_query, tuple(count_params))
+            total_matches = cursor.fetchone()[0]
+    finally:
+        if cursor is not None:
+            cursor.close()
+        # Return the connection to the pool (or close it if it is not pooled)
+        db_connection.close()
 
     # Collapse entries for the same Ensembl ID
+    # (groupby also orders the results by Ensembl ID)
     # .applymap was renamed to .map in pandas 2.1.0
     try:
         df = df.groupby("ensembl_id").agg(tuple).map(list).reset_index()
@@ -332,13 +354,12 @@ def search(
         for syn in df["synonym"].values
     ]
 
-    # If limit is not None, keep only the first {limit} rows
     if limit != None:
         # Print number of genes/transcripts found versus fetched
         if verbose:
-            logger.info(f"Returning {limit} matches of {len(df)} total matches found.")
-        # Remove all but limit rows
-        df = df.head(limit)
+            logger.info(
+                f"Returning {len(df)} matches of {total_matches} total matches found."
+            )
 
     else:
         # Print number of genes/transcripts fetched
@@ -357,23 +378,162 @@ def search(
         clean_db, release=find_latest_ens_rel(database=ENSEMBL_FTP_URL_NV)
     )
 
+    # Build the URL prefix once and append the IDs in a single vectorized concatenation
     if kingdom:
-        # Add URL to gene summary on Ensembl for invertebrates
-        df["url"] = (
-            f"https://{kingdom}.ensembl.org/"
-            + clean_db
-            + "/Gene/Summary?g="
-            + df["ensembl_id"]
+        # Gene summary on Ensembl for invertebrates
+        url_prefix = f"https://{kingdom}.ensembl.org/{clean_db}/Gene/Summary?g="
+    else:
+        # Gene summary on Ensembl for vertebrates
+        url_prefix = f"https://useast.ensembl.org/{clean_db}/Gene/Summary?g="
+
+    # (Using the underlying array skips index alignment)
+    df["url"] = url_prefix + df["ensembl_id"].values
+
+    return df
+
+
+def search(
+    searchwords,
+    species,
+    release=None,
+    id_type="gene",
+    seqtype=None,
+    andor="or",
+    limit=None,
+    wrap_text=False,
+    json=False,
+    save=False,
+    verbose=True,
+    refresh=False,
+    match_mode="substring",
+):
+    """
+    Function to query Ensembl for genes based on species and free form search terms.
+    Automatically fetches results from latest Ensembl release, unless user specifies database (see 'species' argument)
+    or release database (see 'release' argument).
+
+    Args:
+    - searchwords     Free form search words (not case-sensitive) as a string or list of strings
+                      (e.g.searchwords = ["GABA", "gamma-aminobutyric"]).
+    - species         Species can be passed in the format "genus_species", e.g. "homo_sapiens" or "arabidopsis_thaliana".
+                      To pass a specific database, enter the name of the core database, e.g. "mus_musculus_dba2j_core_105_1".
+                      All available core databases can be found here:
+                      Vertebrates: http://ftp.ensembl.org/pub/current/mysql/
+                      Invertebrates: http://ftp.ensemblgenomes.org/pub/current/ + kingdom + mysql/
+    - release         Defines the Ensembl release number from which the files are fetched, e.g. 104.
+                      Note: This argument does not apply to invertebrate species (you can pass a specific core database (which includes release number) to the species argument instead).
+                      This argument is overwritten if a specific database (which includes a release number) is passed to the species argument.
+                      Default: None -> latest Ensembl release is used
+    - id_type         "gene" (default) or "transcript"
+                      Defines whether genes or transcripts matching the searchwords are returned.
+    - andor           "or" (default) or "and"
+                      "or": Returns all genes that INCLUDE AT LEAST ONE of the searchwords in their name/description.
+                      "and": Returns only genes that INCLUDE ALL of the searchwords in their name/description.
+    - limit           (int) Limit the number of search results returned (default: None).
+    - wrap_text       If True, displays data frame with wrapped text for easy reading. Default: False.
+    - json            If True, returns results in json format instead of data frame. Default: False.
+    - save            If True, the data frame is saved as a csv in the current directory (default: False).
+    - verbose         True/False whether to print progress information. Default True.
+    - refresh         If True, fetches the results from Ensembl even if an identical search was run before
+                      in the same session (results of the last 128 searches are cached). Default: False.
+    - match_mode      "substring" (default) or "prefix"
+                      "substring": Returns genes that contain the searchwords anywhere in their name/description.
+                      "prefix": Returns only genes whose name/description STARTS WITH the searchwords
+                      (searchwords that appear later in a description are not matched).
+
+    Returns a data frame with the query results.
+
+    Note: Only returns results based on matches in the "gene name" or "description" sections in the Ensembl database.
+
+    Deprecated arguments: 'seqtype' (renamed to id_type)
+    """
+    # Handle deprecated arguments
+    if seqtype:
+        logger.error(
+            "'seqtype' argument deprecated! Please use argument 'id_type' instead."
+        )
+        return
+
+    ## Check validity or arguments
+    # Check if limit is valid
+    if limit is not None and (
+        not isinstance(limit, int) or isinstance(limit, bool) or limit < 0
+    ):
+        raise ValueError(
+            f"'limit' argument specified as {limit}. Expected a non-negative integer."
+        )
+
+    # Check if id_type is valid
+    id_types = ["gene", "transcript"]
+    id_type = id_type.lower()
+    if id_type not in id_types:
+        raise ValueError(
+            f"ID type (id_type) specified is '{id_type}'. Expected one of: {', '.join(id_types)}"
+        )
+
+    # Check if 'andor' arg is valid
+    andors = ["and", "or"]
+    andor = andor.lower()
+    if andor not in andors:
+        raise ValueError(
+            f"'andor' argument specified as {andor}. Expected one of {', '.join(andors)}"
+        )
+
+    # Check if 'match_mode' arg is valid
+    match_modes = ["substring", "prefix"]
+    match_mode = match_mode.lower()
+    if match_mode not in match_modes:
+        raise ValueError(
+            f"'match_mode' argument specified as {match_mode}. Expected one of {', '.join(match_modes)}"
         )
 
+    ## Clean up species
+    # Species shortcuts
+    species = ENSEMBL_SPECIES_SHORTCUTS.get(species, species)
+
+    # If a specific database is passed with the "/" at the end, remove it
+    if "/" in species:
+        species = species.split("/")[0]
+
+    # In case species was passed with upper case letters
+    species = species.lower()
+
+    ## Clean up list of searchwords
+    # If single searchword passed as string, convert to list
+    if type(searchwords) == str:
+        searchwords = [searchwords]
+
+    # Return a copy of the cached results if the same search was run before
+    # (searchwords are not case-sensitive, and their order only changes the results for andor="and",
+    # which keeps the results matching the first searchword)
+    searchwords_key = [searchword.lower() for searchword in searchwords]
+    if andor == "or":
+        searchwords_key = sorted(set(searchwords_key))
+    cache_key = (
+        species,
+        release,
+        id_type,
+        tuple(searchwords_key),
+        andor,
+        limit,
+        match_mode,
+    )
+    if not refresh and cache_key in _SEARCH_CACHE:
+        _SEARCH_CACHE.move_to_end(cache_key)
+        df = copy_search_results(_SEARCH_CACHE[cache_key])
+        if verbose:
+            logger.info(
+                "Returning cached results of a previous identical search. Use refresh=True to fetch them again."
+            )
     else:
-        # Add URL to gene summary on Ensembl for vertebrates
-        df["url"] = (
-            "https://useast.ensembl.org/"
-            + clean_db
-            + "/Gene/Summary?g="
-            + df["ensembl_id"]
+        df = fetch_search_results(
+            searchwords, species, release, id_type, andor, limit, match_mode, verbose
         )
+        _SEARCH_CACHE[cache_key] = copy_search_results(df)
+        _SEARCH_CACHE.move_to_end(cache_key)
+        # Drop the least recently used results once the cache is full
+        if len(_SEARCH_CACHE) > SEARCH_CACHE_SIZE:
+            _SEARCH_CACHE.popitem(last=False)
 
     if wrap_text:
         df_wrapped = df.copy()
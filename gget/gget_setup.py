@@ -7,7 +7,7 @@ import platform
 import uuid
 from platform import python_version
 
-from .utils import set_up_logger
+from .utils import set_up_logger, tsv_to_parquet
 
 logger = set_up_logger()
 
@@ -206,6 +206,26 @@ def setup(module, verbose=True, out=None):
         else:
             logger.error("ELM interactions domains file missing.")
 
+        # Save Parquet copies of the tsv files, which gget elm reads instead of parsing the tsv files
+        # (the classes and instances files start with 5 comment lines)
+        if out is None:
+            try:
+                for tsv_file, skiprows in [
+                    (elm_classes_tsv, 5),
+                    (elm_instances_tsv, 5),
+                    (elm_intdomains_tsv, None),
+                ]:
+                    tsv_to_parquet(tsv_file, skiprows=skiprows)
+            except ImportError:
+                if verbose:
+                    logger.info(
+                        "Install pyarrow to speed up loading the ELM database files in gget elm."
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Parquet copies of the ELM database files could not be saved: {e}"
+                )
+
     elif module == "alphafold":
         if platform.system() == "Windows":
             logger.error(
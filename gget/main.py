@@ -3,42 +3,17 @@ import sys
 from datetime import datetime
 from typing import Optional
 
-import pandas as pd
-
 # Get current date and time for alphafold default foldername
 dt_string = datetime.now().strftime("%Y_%m_%d-%H_%M")
 
 import os
 import json
 
-from .utils import set_up_logger
-
-logger = set_up_logger()
-
 from .__init__ import __version__
+from .constants import OPENTARGETS_RESOURCES
 
-# Module functions
-from .gget_ref import ref
-from .gget_search import search
-from .gget_info import info
-from .gget_seq import seq
-from .gget_muscle import muscle
-from .gget_blast import blast
-from .gget_blat import blat
-from .gget_enrichr import enrichr
-from .gget_archs4 import archs4
-from .gget_alphafold import alphafold
-from .gget_setup import setup
-from .gget_pdb import pdb
-from .gget_gpt import gpt
-from .gget_cellxgene import cellxgene
-from .gget_elm import elm
-from .gget_diamond import diamond
-from .gget_cosmic import cosmic
-from .gget_mutate import mutate
-from .gget_opentargets import opentargets, OPENTARGETS_RESOURCES
-from .gget_cbio import cbio_plot, cbio_search
-from .gget_bgee import bgee
+# (The module functions, pandas and the logger are imported inside main() once the arguments
+# have been parsed, so that the help and version returns do not load the full pandas stack)
 
 
 # Custom formatter for help messages that preserved the text formatting and adds the default value to the end of the help message
@@ -294,6 +269,18 @@ def main():
         required=False,
         help="Limits the number of results, e.g. 10 (default: None).",
     )
+    parser_gget.add_argument(
+        "-mm",
+        "--match_mode",
+        choices=["substring", "prefix"],
+        default="substring",
+        type=str,
+        required=False,
+        help=(
+            "'substring': Returns genes that contain the searchwords anywhere in their name/description (default).\n"
+            "'prefix': Only return genes whose name/description starts with the searchwords."
+        ),
+    )
     parser_gget.add_argument(
         "-csv",
         "--csv",
@@ -2455,6 +2442,35 @@ def main():
             parent_parser.print_help(sys.stderr)
         sys.exit(1)
 
+    import pandas as pd
+
+    from .utils import set_up_logger
+
+    logger = set_up_logger()
+
+    # Module functions
+    from .gget_ref import ref
+    from .gget_search import search
+    from .gget_info import info
+    from .gget_seq import seq
+    from .gget_muscle import muscle
+    from .gget_blast import blast
+    from .gget_blat import blat
+    from .gget_enrichr import enrichr
+    from .gget_archs4 import archs4
+    from .gget_alphafold import alphafold
+    from .gget_setup import setup
+    from .gget_pdb import pdb
+    from .gget_gpt import gpt
+    from .gget_cellxgene import cellxgene
+    from .gget_elm import elm
+    from .gget_diamond import diamond
+    from .gget_cosmic import cosmic
+    from .gget_mutate import mutate
+    from .gget_opentargets import opentargets
+    from .gget_cbio import cbio_plot, cbio_search
+    from .gget_bgee import bgee
+
     ## cellxgene return
     if args.command == "cellxgene":
         cellxgene(
@@ -2972,6 +2988,7 @@ def main():
             seqtype=args.seqtype,
             andor=args.andor,
             limit=args.limit,
+            match_mode=args.match_mode,
             json=args.csv,
             verbose=args.quiet,
         )
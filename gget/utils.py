@@ -1,11 +1,12 @@
 from bs4 import BeautifulSoup
 import requests
-
-# from requests.adapters import HTTPAdapter, Retry
-# import time
+from requests.adapters import HTTPAdapter
+from requests.adapters import Retry
 import re
 import os
-import uuid
+import tempfile
+import copy
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from IPython.display import display, HTML
@@ -23,6 +24,37 @@ from .constants import (
     COSMIC_RELEASE_URL,
 )
 
+# Matches the link of each entry in an FTP directory listing
+FTP_HREF_RE = re.compile(r'<a\s[^>]*href="([^"]*)"')
+
+# Session for requests to the Ensembl FTP servers, so that connections are kept alive and reused across requests
+# (the pool is large enough for the listings that gget ref fetches concurrently)
+FTP_SESSION = requests.Session()
+FTP_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+FTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Session for requests to the UniProt REST API, so that the connection is reused across IDs
+# Requests that fail because the server is busy or rate limiting are retried with exponential backoff
+# (after the last retry the response is returned as is, so the usual error handling applies)
+UNIPROT_SESSION = requests.Session()
+UNIPROT_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        )
+    ),
+)
+
+# Number of UniProt REST API responses that are kept in memory
+UNIPROT_CACHE_SIZE = 256
+
+# Parsed UniProt REST API responses keyed by request URL (least recently used first)
+_UNIPROT_CACHE = OrderedDict()
+
 
 def set_up_logger():
     logging_level_name = os.getenv("GGET_LOGLEVEL", "INFO")
@@ -234,6 +266,38 @@ def aa_colors(amino_acid):
     return f"\033[38;5;{textcolor}m\033[48;5;{bkg_color}m{amino_acid}\033[0;0m"
 
 
+def get_uniprot_json(url):
+    """
+    Submit a request to the UniProt REST API and return the parsed json response.
+    Successful responses are cached, so repeated queries (e.g. for the same UniProt Acc) are only sent once per session.
+
+    Args:
+    - url   UniProt REST API request URL
+
+    Returns: json response (a copy for cached responses, so callers can modify it)
+    """
+    if url in _UNIPROT_CACHE:
+        _UNIPROT_CACHE.move_to_end(url)
+        return copy.deepcopy(_UNIPROT_CACHE[url])
+
+    r = UNIPROT_SESSION.get(url)
+    if not r.ok:
+        logger.error(
+            f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
+        )
+    # Convert to json
+    json = r.json()
+
+    # Only cache successful responses
+    if r.ok:
+        _UNIPROT_CACHE[url] = copy.deepcopy(json)
+        # Drop the least recently used response once the cache is full
+        if len(_UNIPROT_CACHE) > UNIPROT_CACHE_SIZE:
+            _UNIPROT_CACHE.popitem(last=False)
+
+    return json
+
+
 def get_uniprot_seqs(server, ensembl_ids):
     """
     Retrieve UniProt sequences based on Ensemsbl, WormBase or FlyBase identifiers.
@@ -249,30 +313,18 @@ def get_uniprot_seqs(server, ensembl_ids):
     if type(ensembl_ids) == str:
         ensembl_ids = [ensembl_ids]
 
-    # Initiate data frame so empty df will be returned if no matches are found
-    master_df = pd.DataFrame()
+    # Collect the results for each ID and combine them once at the end
+    dfs = []
 
     for id_ in ensembl_ids:
         # API documentation: https://www.uniprot.org/help/api_queries
         # Submit server request
-        r = requests.get(server + id_ + "+AND+reviewed:true")
-        if not r.ok:
-            logger.error(
-                f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
-            )
-        # Convert to json
-        json = r.json()
+        json = get_uniprot_json(server + id_ + "+AND+reviewed:true")
 
         # If no reviewed results were found, try again for unreviewed results
         if not len(json["results"]) > 0:
             # Submit server request
-            r = requests.get(server + id_)
-            if not r.ok:
-                logger.error(
-                    f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
-                )
-            # Convert to json
-            json = r.json()
+            json = get_uniprot_json(server + id_)
 
             # Warn user if unreviewed results were found
             if len(json["results"]) > 0:
@@ -314,14 +366,18 @@ def get_uniprot_seqs(server, ensembl_ids):
             df["gene_name"] = gene_names
             df["query"] = id_
 
-            # Append results for this ID to master data frame
-            master_df = pd.concat([master_df, df], axis=0)
+            # Append results for this ID to list of results
+            dfs.append(df)
 
         else:
             # If no results were found, warn user and do nothing -> returns empty df
             logger.warning(f"No UniProt sequences were found for ID {id_}.")
 
-    return master_df
+    # Return empty df if no matches were found
+    if len(dfs) == 0:
+        return pd.DataFrame()
+
+    return pd.concat(dfs, axis=0)
 
 
 def get_uniprot_info(server, ensembl_id, verbose=True):
@@ -337,7 +393,7 @@ def get_uniprot_info(server, ensembl_id, verbose=True):
     """
     # API documentation: https://www.uniprot.org/help/api_queries
     # Submit server request for reviewed entries
-    r = requests.get(server + ensembl_id + "+AND+reviewed:true")
+    r = UNIPROT_SESSION.get(server + ensembl_id + "+AND+reviewed:true")
     if not r.ok:
         logger.error(
             f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -348,7 +404,7 @@ def get_uniprot_info(server, ensembl_id, verbose=True):
     # If no reviewed entries were found, try again for unreviewed entries
     if not len(json["results"]) > 0:
         # Submit server request
-        r = requests.get(server + ensembl_id)
+        r = UNIPROT_SESSION.get(server + ensembl_id)
         if not r.ok:
             logger.error(
                 f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -708,26 +764,7 @@ def find_latest_ens_rel(database=ENSEMBL_FTP_URL):
     Args:
     - database    Link to Ensembl database.
     """
-    # html = requests.get(database)
-
-    # # Raise error if status code not "OK" Response
-    # if html.status_code != 200:
-    #     raise RuntimeError(
-    #         f"The Ensembl FTP server returned error status code {html.status_code}. Please try again."
-    #     )
-
-    # soup = BeautifulSoup(html.text, "html.parser")
-    # # Find all releases
-    # releases = soup.body.findAll(string=re.compile("release-"))
-    # # Get release numbers
-    # rels = []
-    # for rel in releases:
-    #     rels.append(rel.split("/")[0].split("-")[-1])
-
-    # # Find highest release number (= latest release)
-    # ENS_rel = np.array(rels).astype(int).max()
-
-    html = requests.get(database + "VERSION")
+    html = FTP_SESSION.get(database + "VERSION")
     if html.status_code != 200:
         raise RuntimeError(
             f"The Ensembl FTP server returned error status code {html.status_code}. Please try again."
@@ -765,7 +802,7 @@ def search_species_options(database=ENSEMBL_FTP_URL, release=None):
         kds = ["plants", "protists", "metazoa", "fungi"]
         for kingdom in kds:
             url = database + f"release-{ENS_rel}/{kingdom}/mysql/"
-            html = requests.get(url)
+            html = FTP_SESSION.get(url)
 
             # Raise error if status code not "OK" Response
             if html.status_code != 200:
@@ -773,16 +810,14 @@ def search_species_options(database=ENSEMBL_FTP_URL, release=None):
                     f"The Ensembl server returned error status code {html.status_code}. Please try again."
                 )
 
-            soup = BeautifulSoup(html.text, "html.parser")
-
             # Find all available databases
-            for subsoup in soup.body.findAll("a"):
-                if "core" in subsoup["href"]:
-                    databases.append(subsoup["href"].split("/")[0])
+            for href in FTP_HREF_RE.findall(html.text):
+                if "core" in href:
+                    databases.append(href.split("/")[0])
 
     else:
         url = database + f"release-{ENS_rel}/mysql/"
-        html = requests.get(url)
+        html = FTP_SESSION.get(url)
 
         # Raise error if status code not "OK" Response
         if html.status_code != 200:
@@ -790,13 +825,11 @@ def search_species_options(database=ENSEMBL_FTP_URL, release=None):
                 f"The Ensembl server returned error status code {html.status_code}. Please try again."
             )
 
-        soup = BeautifulSoup(html.text, "html.parser")
-
         # Return list of all available databases
         databases = []
-        for subsoup in soup.body.findAll("a"):
-            if "core" in subsoup["href"]:
-                databases.append(subsoup["href"].split("/")[0])
+        for href in FTP_HREF_RE.findall(html.text):
+            if "core" in href:
+                databases.append(href.split("/")[0])
 
     return databases
 
@@ -805,7 +838,7 @@ def find_nv_kingdom(species, release):
     kds = ["plants", "protists", "metazoa", "fungi"]
     for kingdom in kds:
         url = ENSEMBL_FTP_URL_NV + f"release-{release}/{kingdom}/fasta/"
-        html = requests.get(url)
+        html = FTP_SESSION.get(url)
 
         # Raise error if status code not "OK" Response
         if html.status_code != 200:
@@ -814,11 +847,7 @@ def find_nv_kingdom(species, release):
             )
 
         # Parse the html and generate a clean list of the available genomes
-        soup = BeautifulSoup(html.text, "html.parser")
-
-        sps = []
-        for subsoup in soup.body.findAll("a"):
-            sps.append(subsoup["href"].split("/")[0])
+        sps = [href.split("/")[0] for href in FTP_HREF_RE.findall(html.text)]
 
         # Return kingdom if species was found
         if species in sps[5:]:
@@ -859,7 +888,7 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
                 url = database + f"release-{ENS_rel}/{kingdom}/gtf/"
             elif which in ("dna", "cdna"):
                 url = database + f"release-{ENS_rel}/{kingdom}/fasta/"
-            html = requests.get(url)
+            html = FTP_SESSION.get(url)
 
             # Raise error if status code not "OK" Response
             if html.status_code != 200:
@@ -868,11 +897,7 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
                 )
 
             # Parse the html and generate a clean list of the available genomes
-            soup = BeautifulSoup(html.text, "html.parser")
-
-            sps = []
-            for subsoup in soup.body.findAll("a"):
-                sps.append(subsoup["href"].split("/")[0])
+            sps = [href.split("/")[0] for href in FTP_HREF_RE.findall(html.text)]
 
             species_list.append(sps[5:])
 
@@ -884,7 +909,7 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
             url = database + f"release-{ENS_rel}/gtf/"
         elif which in ("dna", "cdna"):
             url = database + f"release-{ENS_rel}/fasta/"
-        html = requests.get(url)
+        html = FTP_SESSION.get(url)
 
         # Raise error if status code not "OK" Response
         if html.status_code != 200:
@@ -893,11 +918,7 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
             )
 
         # Parse the html and generate a clean list of the available genomes
-        soup = BeautifulSoup(html.text, "html.parser")
-
-        sps = []
-        for subsoup in soup.body.findAll("a"):
-            sps.append(subsoup["href"].split("/")[0])
+        sps = [href.split("/")[0] for href in FTP_HREF_RE.findall(html.text)]
 
         species_list = sps[5:]
 
@@ -1000,6 +1021,50 @@ def tsv_to_df(tsv_file, headers=None, skiprows=None):
         raise RuntimeError(f"tsv to data frame reformatting failed.")
 
 
+def tsv_parquet_path(tsv_file):
+    """
+    Get the path of the Parquet copy of a tsv file (see tsv_to_parquet).
+
+    Args:
+    - tsv_file      Path to tsv file
+
+    Returns: path to the Parquet file (same name with the .parquet extension).
+    """
+    return os.path.splitext(tsv_file)[0] + ".parquet"
+
+
+def tsv_to_parquet(tsv_file, skiprows=None):
+    """
+    Save a Parquet copy of a tsv file next to it, which is faster to read than the tsv file.
+    The copy is written to a temporary file first and then moved into place,
+    so that other processes never read an incomplete copy.
+
+    Args:
+    - tsv_file      File to be converted
+    - skiprows      Number of lines to skip before the headers
+
+    Returns: path to the Parquet file. Raises ImportError if no Parquet engine (pyarrow or fastparquet) is installed.
+    """
+    parquet_file = tsv_parquet_path(tsv_file)
+    df = tsv_to_df(tsv_file, skiprows=skiprows)
+
+    tmp_file = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(parquet_file)),
+        prefix="tmp_",
+        suffix=".parquet",
+        delete=False,
+    )
+    tmp_file.close()
+    try:
+        df.to_parquet(tmp_file.name, index=False)
+        os.replace(tmp_file.name, parquet_file)
+    finally:
+        if os.path.exists(tmp_file.name):
+            os.remove(tmp_file.name)
+
+    return parquet_file
+
+
 def create_tmp_fasta(sequences):
     """
     Create temporary FASTA file from str or list of sequences.
@@ -1009,17 +1074,17 @@ def create_tmp_fasta(sequences):
 
     Returns: Absolute path to temoprary FASTA file.
     """
-    # Generate random ID
-    random_id = str(uuid.uuid4())
-
     if type(sequences) == str:
         sequences = [sequences]
 
-    with open(f"tmp_{random_id}.fa", "w") as f:
-        for idx, seq in enumerate(sequences):
-            f.write(f">Seq{idx}\n" + seq + "\n")
+    # Create the file in the system's temporary directory (instead of the current working directory)
+    # and write all records at once
+    with tempfile.NamedTemporaryFile(
+        mode="w", prefix="tmp_", suffix=".fa", delete=False
+    ) as f:
+        f.writelines(f">Seq{idx}\n{seq}\n" for idx, seq in enumerate(sequences))
 
-    return os.path.abspath(f"tmp_{random_id}.fa")
+    return os.path.abspath(f.name)
 
 
 def remove_temp_files(files_to_delete):
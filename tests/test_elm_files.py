@@ -0,0 +1,369 @@
+import unittest
+from unittest import mock
+import os
+import re
+import shutil
+import tempfile
+import pandas as pd
+
+import gget.gget_elm as gget_elm
+from gget.gget_elm import load_elm_tsv
+from gget.utils import tsv_to_df, tsv_to_parquet
+
+# Small ELM database files in the format of the ELM downloads
+# (tests/test_elm.py downloads the full database with gget setup, these tests run offline)
+ELM_FIXTURES = "./tests/fixtures/elm"
+
+
+class ELMFilesTestCase(unittest.TestCase):
+    """
+    Runs each test against a temporary copy of the fixture files, so that tests can modify them.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for file_name in os.listdir(ELM_FIXTURES):
+            shutil.copy(os.path.join(ELM_FIXTURES, file_name), self.tmp_dir)
+
+        self.classes_tsv = os.path.join(self.tmp_dir, "elms_classes.tsv")
+        self.instances_tsv = os.path.join(self.tmp_dir, "elm_instances.tsv")
+        self.intdomains_tsv = os.path.join(self.tmp_dir, "elm_interaction_domains.tsv")
+
+        self.patches = [
+            mock.patch.object(gget_elm, "ELM_CLASSES_TSV", self.classes_tsv),
+            mock.patch.object(gget_elm, "ELM_INSTANCES_TSV", self.instances_tsv),
+            mock.patch.object(gget_elm, "ELM_INTDOMAINS_TSV", self.intdomains_tsv),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.clear_caches()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    @staticmethod
+    def clear_caches():
+        gget_elm._cached_tsv_to_df.cache_clear()
+        gget_elm._cached_tsv_row_index.cache_clear()
+        gget_elm._cached_elm_regexes.cache_clear()
+
+
+class TestLoadELMTsv(ELMFilesTestCase):
+    def test_matches_tsv_to_df(self):
+        for tsv_file, skiprows in [
+            (self.classes_tsv, 5),
+            (self.instances_tsv, 5),
+            (self.intdomains_tsv, None),
+        ]:
+            expected = tsv_to_df(tsv_file, skiprows=skiprows)
+            result = load_elm_tsv(tsv_file, skiprows=skiprows)
+            self.assertListEqual(list(result.dtypes), list(expected.dtypes))
+            self.assertTrue(result.equals(expected))
+
+    def test_rename_columns(self):
+        result = load_elm_tsv(
+            self.intdomains_tsv, rename_columns=gget_elm.ELM_INTDOMAINS_COLUMNS
+        )
+        self.assertListEqual(
+            list(result.columns), list(gget_elm.ELM_INTDOMAINS_COLUMNS.values())
+        )
+
+    def test_parquet_copy_matches_tsv_to_df(self):
+        try:
+            tsv_to_parquet(self.instances_tsv, skiprows=5)
+        except ImportError:
+            self.skipTest("No Parquet engine installed")
+
+        expected = tsv_to_df(self.instances_tsv, skiprows=5)
+        result = load_elm_tsv(self.instances_tsv, skiprows=5)
+        self.assertListEqual(list(result.dtypes), list(expected.dtypes))
+        self.assertTrue(result.equals(expected))
+        # Missing strings are NaN as with read_csv (not None)
+        self.assertIsInstance(result["PDB"].iloc[0], float)
+
+    def test_file_is_parsed_once(self):
+        with mock.patch.object(
+            gget_elm, "tsv_to_df", wraps=gget_elm.tsv_to_df
+        ) as tsv_to_df_mock:
+            load_elm_tsv(self.classes_tsv, skiprows=5)
+            load_elm_tsv(self.classes_tsv, skiprows=5)
+        self.assertEqual(tsv_to_df_mock.call_count, 1)
+
+    def test_calls_return_fresh_copies(self):
+        df1 = load_elm_tsv(self.classes_tsv, skiprows=5)
+        df1.loc[0, "ELMIdentifier"] = "modified"
+        df1["new_column"] = 1
+
+        df2 = load_elm_tsv(self.classes_tsv, skiprows=5)
+        self.assertIsNot(df1, df2)
+        self.assertEqual(df2.loc[0, "ELMIdentifier"], "CLV_PCSK_FUR_1")
+        self.assertNotIn("new_column", df2.columns)
+
+    def test_modified_file_is_read_again(self):
+        df1 = load_elm_tsv(self.intdomains_tsv)
+
+        with open(self.intdomains_tsv, "a") as tsv_file:
+            tsv_file.write(
+                '"MOD_CK2_1"\t"PF00069"\t"Protein kinase domain"\t"Pkinase"\n'
+            )
+        # Make sure the modification time changes even on file systems with a coarse resolution
+        mtime = os.path.getmtime(self.intdomains_tsv) + 10
+        os.utime(self.intdomains_tsv, (mtime, mtime))
+
+        df2 = load_elm_tsv(self.intdomains_tsv)
+        self.assertEqual(len(df2), len(df1) + 1)
+        self.assertEqual(df2["ELM identifier"].iloc[-1], "MOD_CK2_1")
+
+
+def get_elm_instances_by_filter(UniProtID):
+    # get_elm_instances as it was before the rows were looked up through an index
+    df_full_instances = tsv_to_df(gget_elm.ELM_INSTANCES_TSV, skiprows=5)
+    df_instances_matching = df_full_instances[
+        df_full_instances["Primary_Acc"] == UniProtID
+    ]
+    df_instances_matching = df_instances_matching.rename(
+        columns={
+            "Primary_Acc": "Ortholog_UniProt_Acc",
+            "Start": "motif_start_in_subject",
+            "End": "motif_end_in_subject",
+        }
+    )
+    df_classes = tsv_to_df(gget_elm.ELM_CLASSES_TSV, skiprows=5)
+    df_classes = df_classes.rename(columns={"Accession": "class_accession"})
+    df_intdomains = tsv_to_df(gget_elm.ELM_INTDOMAINS_TSV)
+    df_intdomains = df_intdomains.rename(columns=gget_elm.ELM_INTDOMAINS_COLUMNS)
+
+    df_final = df_instances_matching.merge(df_classes, how="left", on="ELMIdentifier")
+    df_final = df_final.merge(df_intdomains, how="left", on="ELMIdentifier")
+    return df_final
+
+
+class TestELMInstanceIndex(ELMFilesTestCase):
+    # P00001 has several instances that are not next to each other, P00009 has none
+    accessions = ["P00001", "P00002", "P00003", "P00009"]
+
+    def test_index_matches_filter(self):
+        df = load_elm_tsv(self.instances_tsv, skiprows=5)
+        index = gget_elm.load_elm_tsv_index(
+            self.instances_tsv, "Primary_Acc", skiprows=5
+        )
+        for acc in self.accessions:
+            self.assertTrue(
+                df.iloc[index.get(acc, [])].equals(df[df["Primary_Acc"] == acc])
+            )
+
+    def test_get_elm_instances_matches_filter(self):
+        for acc in self.accessions:
+            result = gget_elm.get_elm_instances(acc)
+            expected = get_elm_instances_by_filter(acc)
+            self.assertListEqual(list(result.columns), list(expected.columns))
+            self.assertTrue(result.equals(expected))
+
+        self.assertListEqual(
+            gget_elm.get_elm_instances("P00001")["Accession"].tolist(),
+            # LIG_SH3_3 (ELMI000003) has two interaction domains
+            ["ELMI000001", "ELMI000003", "ELMI000003", "ELMI000005"],
+        )
+        self.assertEqual(len(gget_elm.get_elm_instances("P00009")), 0)
+
+
+def regex_match_by_row(sequence):
+    # regex_match as it was before the match table was built in one go
+    df_elm_classes = tsv_to_df(gget_elm.ELM_CLASSES_TSV, skiprows=5)
+    df_full_instances = tsv_to_df(gget_elm.ELM_INSTANCES_TSV, skiprows=5)
+    df_full_intdomains = tsv_to_df(gget_elm.ELM_INTDOMAINS_TSV)
+    df_full_intdomains = df_full_intdomains.rename(
+        columns=gget_elm.ELM_INTDOMAINS_COLUMNS
+    )
+
+    df_final = pd.DataFrame()
+    for elm_id, pattern in zip(df_elm_classes["Accession"], df_elm_classes["Regex"]):
+        for match_string in re.finditer(f"(?=({pattern}))", sequence):
+            elm_row = df_elm_classes[df_elm_classes["Accession"] == elm_id]
+            elm_row.insert(
+                loc=1,
+                column="Instances (Matched Sequence)",
+                value=match_string.group(1),
+            )
+            (start, end) = match_string.span(1)
+            elm_row.insert(loc=2, column="motif_start_in_query", value=int(start + 1))
+            elm_row.insert(loc=3, column="motif_end_in_query", value=int(end))
+            elm_row = elm_row.merge(df_full_instances, how="left", on="ELMIdentifier")
+            elm_row = elm_row.merge(df_full_intdomains, how="left", on="ELMIdentifier")
+            df_final = pd.concat([df_final, elm_row])
+
+    df_final.rename(columns={"Accession_x": "Instance_accession"}, inplace=True)
+    return df_final.reset_index(drop=True)
+
+
+class TestRegexMatch(ELMFilesTestCase):
+    # Two matches for each of the three ELM classes
+    sequence = "MRARRAPAAPGPLLPSAAEKKRSRRKTPEE"
+
+    def test_columns(self):
+        self.assertListEqual(
+            list(gget_elm.regex_match(self.sequence).columns),
+            [
+                "Instance_accession",
+                "Instances (Matched Sequence)",
+                "motif_start_in_query",
+                "motif_end_in_query",
+                "ELMIdentifier",
+                "FunctionalSiteName",
+                "Description",
+                "Regex",
+                "Probability",
+                "#Instances",
+                "#Instances_in_PDB",
+                "Accession_y",
+                "ELMType",
+                "ProteinName",
+                "Primary_Acc",
+                "Accessions",
+                "Start",
+                "End",
+                "References",
+                "Methods",
+                "InstanceLogic",
+                "PDB",
+                "Organism",
+                "InteractionDomainId",
+                "InteractionDomainDescription",
+                "InteractionDomainName",
+            ],
+        )
+
+    def test_matches(self):
+        df = gget_elm.regex_match(self.sequence)
+        match_cols = [
+            "ELMIdentifier",
+            "Instances (Matched Sequence)",
+            "motif_start_in_query",
+            "motif_end_in_query",
+        ]
+        self.assertListEqual(
+            df[match_cols].drop_duplicates().values.tolist(),
+            [
+                ["CLV_PCSK_FUR_1", "RARRA", 2, 6],
+                ["CLV_PCSK_FUR_1", "RSRRK", 22, 26],
+                ["LIG_SH3_3", "PAAP", 7, 10],
+                ["LIG_SH3_3", "PLLP", 12, 15],
+                ["MOD_CK2_1", "SAAE", 16, 19],
+                ["MOD_CK2_1", "TPEE", 27, 30],
+            ],
+        )
+        # Each match is joined with all instances and interaction domains of its class
+        self.assertEqual(len(df), 2 * 1 + 2 * 3 * 2 + 2 * 2)
+
+    def test_matches_row_by_row_version(self):
+        self.assertTrue(
+            gget_elm.regex_match(self.sequence).equals(
+                regex_match_by_row(self.sequence)
+            )
+        )
+
+    def test_no_matches(self):
+        self.assertIsNone(gget_elm.regex_match("AAAAAAAAAA"))
+
+
+DIAMOND_COLUMNS = [
+    "query_accession",
+    "subject_accession",
+    "identity_percentage",
+    "query_seq_length",
+    "subject_seq_length",
+    "length",
+    "mismatches",
+    "gap_openings",
+    "query_start",
+    "query_end",
+    "subject_start",
+    "subject_end",
+    "e-value",
+    "bit_score",
+]
+
+
+def diamond_hit(query, uniprot_id, subject_start, subject_end):
+    # One row of gget diamond output for a hit of the query sequence against an ELM instance sequence
+    return [
+        query,
+        f"sp|{uniprot_id}|PROA_HUMAN",
+        95.0,
+        60,
+        100,
+        subject_end - subject_start + 1,
+        2,
+        0,
+        1,
+        subject_end - subject_start + 1,
+        subject_start,
+        subject_end,
+        1e-30,
+        120.0,
+    ]
+
+
+class TestSeqWorkflow(ELMFilesTestCase):
+    sequences = ["MKVLAAGIVG", "MAAAAAAAAA", "MPPLPAAPGP"]
+
+    def run_seq_workflow(self, hits):
+        df_diamond = pd.DataFrame(hits, columns=DIAMOND_COLUMNS)
+        with mock.patch.object(
+            gget_elm, "diamond", return_value=df_diamond
+        ) as diamond_mock:
+            df = gget_elm.seq_workflow(
+                self.sequences,
+                reference="elm_instances.fasta",
+                sensitivity="very-sensitive",
+                threads=1,
+                verbose=False,
+                diamond_binary=None,
+            )
+        # All sequences are aligned with a single DIAMOND run
+        diamond_mock.assert_called_once()
+        self.assertListEqual(diamond_mock.call_args[1]["query"], self.sequences)
+        return df
+
+    def test_hits_are_assigned_per_sequence(self):
+        df = self.run_seq_workflow(
+            [
+                diamond_hit("Seq0", "P00001", 1, 50),
+                # Hits of different sequences can be interleaved in the DIAMOND output
+                diamond_hit("Seq2", "P00002", 25, 60),
+                # P00009 has no ELM instances
+                diamond_hit("Seq0", "P00009", 1, 50),
+            ]
+        )
+
+        # Seq1 has no hits, the hits of Seq0 come first
+        self.assertListEqual(
+            df["Ortholog_UniProt_Acc"].tolist(), ["P00001"] * 4 + ["P00002"] * 4
+        )
+        self.assertListEqual(
+            df[["Accession", "subject_start", "subject_end"]]
+            .drop_duplicates()
+            .values.tolist(),
+            [
+                ["ELMI000001", 1, 50],
+                ["ELMI000003", 1, 50],
+                ["ELMI000005", 1, 50],
+                ["ELMI000002", 25, 60],
+                ["ELMI000006", 25, 60],
+            ],
+        )
+        self.assertListEqual(
+            df.drop_duplicates("Accession")[
+                "motif_inside_subject_query_overlap"
+            ].tolist(),
+            [True, True, False, True, False],
+        )
+
+    def test_no_hits_with_elm_instances(self):
+        self.assertIsNone(self.run_seq_workflow([diamond_hit("Seq1", "P00009", 1, 50)]))
+
+    def test_no_hits(self):
+        self.assertIsNone(self.run_seq_workflow([]))
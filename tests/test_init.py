@@ -0,0 +1,39 @@
+import unittest
+import subprocess
+import sys
+import importlib
+
+import gget
+
+
+def run_python(code):
+    # Run in a fresh interpreter, since this test process may already have imported the submodules
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestInit(unittest.TestCase):
+    def test_import_does_not_load_submodules(self):
+        result = run_python(
+            "import sys, gget; print(any(m.startswith('gget.gget_') for m in sys.modules))"
+        )
+        self.assertEqual(result, "False")
+
+    def test_function_is_loaded_on_first_access(self):
+        result = run_python(
+            "import sys, gget; gget.muscle; print('gget.gget_muscle' in sys.modules, 'gget.gget_search' in sys.modules)"
+        )
+        self.assertEqual(result, "True False")
+
+    def test_functions_resolve_to_submodules(self):
+        for name, module in gget._MODULE_FUNCTIONS.items():
+            function = getattr(importlib.import_module(f"gget.{module}"), name)
+            self.assertIs(getattr(gget, name), function)
+
+    def test_dir_lists_all_functions(self):
+        self.assertTrue(set(gget.__all__).issubset(dir(gget)))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            gget.not_a_function
@@ -1,6 +1,7 @@
 import unittest
 import json
-from gget.gget_opentargets import opentargets
+from gget.gget_opentargets import opentargets, _RESOURCES
+from gget.constants import OPENTARGETS_RESOURCES
 from .from_json import from_json
 
 # Load dictionary containing arguments and expected results
@@ -9,4 +10,6 @@ with open("./tests/fixtures/test_opentargets.json") as json_file:
 
 
 class TestOpenTargets(unittest.TestCase, metaclass=from_json(ot_dict, opentargets)):
-    pass  # all tests are loaded from json
+    def test_opentargets_resources_match_constants(self):
+        # The command line parser takes the resource choices from constants.py
+        self.assertEqual(list(_RESOURCES), OPENTARGETS_RESOURCES)
@@ -1,6 +1,11 @@
 import unittest
+from unittest import mock
+import io
 import json
-from gget.gget_ref import ref
+import requests
+from bs4 import BeautifulSoup
+import gget.gget_ref as gget_ref
+from gget.gget_ref import ref, get_FTP_listing, find_FTP_link
 from .from_json import from_json
 
 # Load dictionary containing arguments and expected results
@@ -10,3 +15,125 @@ with open("./tests/fixtures/test_ref.json") as json_file:
 
 class TestRef(unittest.TestCase, metaclass=from_json(ref_dict, ref)):
     pass  # all tests are loaded from json
+
+
+def ftp_response(content, status_code=200, headers=None):
+    # Response as returned by FTP_SESSION.get(..., stream=True)
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(content)
+    response.headers.update(headers or {})
+    return response
+
+
+def find_FTP_link_bs4(html_text, link_substring):
+    # Parser used by gget ref before the listings were parsed with FTP_LISTING_RE
+    soup = BeautifulSoup(html_text, "html.parser")
+    link_str = None
+    date_str = None
+    size_str = None
+    links = [stuff.text.strip() for stuff in soup.find_all("td")]
+    for i, link in enumerate(links):
+        if link_substring in link:
+            link_str = link
+            date_str = links[i + 1]
+            size_str = links[i + 2]
+    return link_str, date_str, size_str
+
+
+class TestFTPListing(unittest.TestCase):
+    url = "https://ftp.ensembl.org/pub/release-112/fasta/homo_sapiens/dna/"
+
+    def setUp(self):
+        gget_ref._FTP_CACHE.clear()
+        with open("./tests/fixtures/ref_ftp_listing.html", "rb") as html_file:
+            self.content = html_file.read()
+
+    def tearDown(self):
+        gget_ref._FTP_CACHE.clear()
+
+    def test_find_FTP_link_matches_bs4_parser(self):
+        link_substrings = [
+            "CHECKSUMS",
+            "dna.primary_assembly.fa",
+            "dna.toplevel.fa",
+            "dna_sm.toplevel.fa",
+            # Several links match, the last one is used
+            "chromosome",
+            "gz",
+            "not_in_listing",
+        ]
+        get = mock.MagicMock(
+            side_effect=lambda *args, **kwargs: ftp_response(self.content)
+        )
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            for link_substring in link_substrings:
+                self.assertEqual(
+                    find_FTP_link(self.url, [link_substring]),
+                    find_FTP_link_bs4(self.content.decode("utf-8"), link_substring),
+                )
+
+    def test_get_FTP_listing_entries(self):
+        get = mock.MagicMock(return_value=ftp_response(self.content))
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            status_code, entries = get_FTP_listing(self.url)
+
+        self.assertEqual(status_code, 200)
+        # Parent directory plus 34 files
+        self.assertEqual(len(entries), 35)
+        self.assertEqual(entries[1], ("CHECKSUMS", "2024-04-09 09:16  ", "3.5K"))
+
+    def test_fresh_fetch_is_cached(self):
+        get = mock.MagicMock(
+            return_value=ftp_response(self.content, headers={"ETag": '"abc"'})
+        )
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            _, entries = get_FTP_listing(self.url)
+            # Second lookup inside the expiry window does not contact the server
+            self.assertEqual(get_FTP_listing(self.url), (200, entries))
+
+        get.assert_called_once_with(self.url, headers={}, stream=True)
+        self.assertEqual(gget_ref._FTP_CACHE[self.url]["etag"], '"abc"')
+
+    def test_expired_listing_is_revalidated(self):
+        get = mock.MagicMock(
+            return_value=ftp_response(
+                self.content,
+                headers={
+                    "ETag": '"abc"',
+                    "Last-Modified": "Tue, 09 Apr 2024 09:16:00 GMT",
+                },
+            )
+        )
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            _, entries = get_FTP_listing(self.url)
+
+        # Age the cached listing past the expiry window
+        gget_ref._FTP_CACHE[self.url]["time"] -= gget_ref.FTP_CACHE_EXPIRE + 1
+
+        get = mock.MagicMock(return_value=ftp_response(b"", status_code=304))
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            # The unchanged listing is reused
+            self.assertEqual(get_FTP_listing(self.url), (200, entries))
+            # and counts as fresh again
+            get_FTP_listing(self.url)
+
+        get.assert_called_once_with(
+            self.url,
+            headers={
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Tue, 09 Apr 2024 09:16:00 GMT",
+            },
+            stream=True,
+        )
+
+    def test_failed_response_is_not_cached(self):
+        get = mock.MagicMock(
+            side_effect=lambda *args, **kwargs: ftp_response(b"", status_code=404)
+        )
+        with mock.patch.object(gget_ref.FTP_SESSION, "get", get):
+            self.assertEqual(get_FTP_listing(self.url), (404, []))
+            self.assertEqual(get_FTP_listing(self.url), (404, []))
+
+        self.assertEqual(get.call_count, 2)
+        self.assertNotIn(self.url, gget_ref._FTP_CACHE)
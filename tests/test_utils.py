@@ -1,5 +1,9 @@
 import unittest
+from unittest import mock
+import os
+import tempfile
 import numpy as np
+import gget.utils as gget_utils
 from gget.utils import (
     n_colors,
     aa_colors,
@@ -10,6 +14,9 @@ from gget.utils import (
     search_species_options,
     ref_species_options,
     read_fasta,
+    create_tmp_fasta,
+    remove_temp_files,
+    get_uniprot_json,
 )
 
 from gget.constants import UNIPROT_REST_API, ENSEMBL_REST_API, ENSEMBL_FTP_URL_NV
@@ -190,3 +197,84 @@ class TestUtils(unittest.TestCase):
     def test_ref_species_options_bad_type(self):
         with self.assertRaises(RuntimeError):
             ref_species_options("gtf", release=2000)
+
+    def test_create_tmp_fasta(self):
+        fasta_path = create_tmp_fasta(["MKVLAAGIVG", "MPPLPAAPGP"])
+        try:
+            # The file is created in the system's temporary directory
+            self.assertEqual(
+                os.path.dirname(fasta_path), os.path.abspath(tempfile.gettempdir())
+            )
+            with open(fasta_path) as fasta_file:
+                self.assertEqual(
+                    fasta_file.read(), ">Seq0\nMKVLAAGIVG\n>Seq1\nMPPLPAAPGP\n"
+                )
+        finally:
+            remove_temp_files([fasta_path])
+
+        self.assertFalse(os.path.exists(fasta_path))
+
+    def test_create_tmp_fasta_str(self):
+        fasta_path = create_tmp_fasta("MKVLAAGIVG")
+        try:
+            with open(fasta_path) as fasta_file:
+                self.assertEqual(fasta_file.read(), ">Seq0\nMKVLAAGIVG\n")
+        finally:
+            remove_temp_files([fasta_path])
+
+        self.assertFalse(os.path.exists(fasta_path))
+
+
+def uniprot_response(results, ok=True):
+    # Response of UNIPROT_SESSION.get
+    response = mock.MagicMock(ok=ok, status_code=200 if ok else 500)
+    response.json.side_effect = lambda: {"results": list(results)}
+    return response
+
+
+class TestUniProtCache(unittest.TestCase):
+    def setUp(self):
+        gget_utils._UNIPROT_CACHE.clear()
+
+    def tearDown(self):
+        gget_utils._UNIPROT_CACHE.clear()
+
+    def test_cache_hit(self):
+        get = mock.MagicMock(return_value=uniprot_response([{"id": "P00001"}]))
+        with mock.patch.object(gget_utils.UNIPROT_SESSION, "get", get):
+            json1 = get_uniprot_json("url1")
+            # Modifying a returned response does not change the cached one
+            json1["results"].append({"id": "P00002"})
+            json2 = get_uniprot_json("url1")
+
+        get.assert_called_once_with("url1")
+        self.assertEqual(json2, {"results": [{"id": "P00001"}]})
+
+    def test_lru_eviction(self):
+        get = mock.MagicMock(side_effect=lambda url: uniprot_response([{"id": url}]))
+        with mock.patch.object(
+            gget_utils.UNIPROT_SESSION, "get", get
+        ), mock.patch.object(gget_utils, "UNIPROT_CACHE_SIZE", 2):
+            get_uniprot_json("url1")
+            get_uniprot_json("url2")
+            # url1 becomes the most recently used response, so url2 is dropped for url3
+            get_uniprot_json("url1")
+            get_uniprot_json("url3")
+            self.assertListEqual(list(gget_utils._UNIPROT_CACHE), ["url1", "url3"])
+
+            get_uniprot_json("url1")
+            get_uniprot_json("url2")
+
+        self.assertListEqual(
+            [call.args[0] for call in get.call_args_list],
+            ["url1", "url2", "url3", "url2"],
+        )
+
+    def test_failed_response_is_not_cached(self):
+        get = mock.MagicMock(return_value=uniprot_response([], ok=False))
+        with mock.patch.object(gget_utils.UNIPROT_SESSION, "get", get):
+            self.assertEqual(get_uniprot_json("url1"), {"results": []})
+            get_uniprot_json("url1")
+
+        self.assertEqual(get.call_count, 2)
+        self.assertNotIn("url1", gget_utils._UNIPROT_CACHE)